@@ -0,0 +1,7 @@
+"""
+Shared helpers for the daily puzzle solutions.
+
+The solutions themselves live in `day-N/day-N.py` and stay runnable on their
+own (`cd day-3; python3 day-3.py`). This package holds the bits that would
+otherwise be copied into every one of them.
+"""
@@ -0,0 +1,308 @@
+"""
+Benchmark harness for the daily puzzle solutions.
+
+Each day registers one setup function per puzzle part:
+
+    @bench.register(day=1, part=1)
+    def bench_part_1():
+        numbers = read_numbers()
+        return lambda: find_pair(numbers, 2020)
+
+The setup function does all the work we don't want to measure (reading and
+parsing the input, ...) and returns a callable without arguments, which
+solves the part and returns its answer. Only that callable is timed. Setup functions take the input file name as optional
+argument, so that the same benchmarks can run on generated inputs (see
+`aoc/scaling.py`).
+
+Every part runs in a fresh process, so that the reported peak RSS belongs to
+that part alone. For each part we report:
+  - min/median/p95 wall time of the timed runs (warmup runs are discarded,
+    the overhead of the timer itself is subtracted)
+  - peak memory allocated by Python during one run (via `tracemalloc`)
+  - peak resident set size of the process
+
+Usage (from the repository root):
+
+    python3 -m aoc.bench                  # all days
+    python3 -m aoc.bench 1 5 11           # selected days
+    python3 -m aoc.bench 15 --part 1 --json bench.json
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from aoc.days import ROOT, day_paths, load_day
+
+# map from (day, part) -> setup function
+registry = {}
+
+
+def register(day, part):
+    """
+    Decorator: register `setup` as the benchmark for part `part` of day `day`.
+    """
+    def decorator(setup):
+        registry[(day, part)] = setup
+        return setup
+    return decorator
+
+
+###############################
+# Measuring
+###############################
+
+def percentile(samples, p):
+    """
+    Nearest-rank percentile `p` (0-100) of a list of samples.
+    """
+    ordered = sorted(samples)
+    rank = math.ceil(p / 100 * len(ordered))
+    return ordered[max(rank - 1, 0)]
+
+
+def timer_overhead(num_runs=1000):
+    """
+    Time a call that does nothing. This fixed cost is included in
+    every measurement, so we subtract it again.
+    """
+    noop = lambda: None
+    samples = []
+    for _ in range(num_runs):
+        start = time.perf_counter()
+        noop()
+        samples.append(time.perf_counter() - start)
+    return min(samples)
+
+
+def peak_rss():
+    """
+    Peak resident set size of the current process in bytes.
+    """
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def measure(day, part, fname=None, warmup=1, repeat=5, max_time=10.0, trace_allocations=True):
+    """
+    Benchmark part `part` of day `day` in the current process.
+    If `fname` is given, the part runs on that input file instead of the puzzle input.
+
+    Runs `warmup` untimed runs followed by up to `repeat` timed runs.
+    Once the runs took more than `max_time` seconds in total, no further
+    runs are started (but there is always at least one timed run).
+
+    Returns a dict with the measurements (times in seconds, memory in bytes).
+    """
+    if repeat < 1:
+        raise ValueError(f'repeat must be at least 1, got {repeat}')
+    load_day(day)
+    setup = registry[(day, part)]
+    fn = setup(fname) if fname else setup()
+
+    budget_start = time.perf_counter()
+    for _ in range(warmup):
+        fn()
+        if time.perf_counter() - budget_start > max_time:
+            break
+
+    overhead = timer_overhead()
+    samples = []
+    while len(samples) < repeat:
+        start = time.perf_counter()
+        result = fn()
+        samples.append(max(time.perf_counter() - start - overhead, 0.0))
+        if time.perf_counter() - budget_start > max_time:
+            break
+
+    # read before tracing, as tracemalloc needs quite a bit of memory itself
+    rss = peak_rss()
+
+    # tracing allocations slows things down a lot, so we do it in a separate run
+    alloc_peak = None
+    if trace_allocations:
+        tracemalloc.start()
+        fn()
+        _, alloc_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'day': day,
+        'part': part,
+        'result': result if isinstance(result, (int, float, str)) else repr(result),
+        'runs': len(samples),
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'p95': percentile(samples, 95),
+        'alloc_peak': alloc_peak,
+        'peak_rss': rss,
+    }
+
+
+def _measure_child(conn, day, part, kwargs):
+    try:
+        conn.send(('ok', measure(day, part, **kwargs)))
+    except BaseException as e:
+        conn.send(('error', f'{type(e).__name__}: {e}'))
+    finally:
+        conn.close()
+
+
+def measure_isolated(day, part, **kwargs):
+    """
+    Same as `measure`, but in a freshly spawned process.
+    Raises a RuntimeError if the benchmark failed.
+    """
+    ctx = multiprocessing.get_context('spawn')
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_measure_child, args=(child_conn, day, part, kwargs))
+    process.start()
+    child_conn.close()
+    try:
+        status, payload = parent_conn.recv()
+    except EOFError:
+        status, payload = 'error', f'benchmark process died (exit code {process.exitcode})'
+    process.join()
+
+    if status != 'ok':
+        raise RuntimeError(f'day {day} part {part}: {payload}')
+    return payload
+
+
+###############################
+# Reporting
+###############################
+
+def format_seconds(seconds):
+    for unit, factor in (('s', 1), ('ms', 1e3), ('µs', 1e6)):
+        if seconds * factor >= 1:
+            return f'{seconds * factor:.2f} {unit}'
+    return f'{seconds * 1e9:.0f} ns'
+
+
+def format_bytes(num_bytes):
+    if num_bytes is None:
+        return '-'
+    for unit in ('B', 'KiB', 'MiB'):
+        if num_bytes < 1024:
+            return f'{num_bytes:.0f} {unit}'
+        num_bytes /= 1024
+    return f'{num_bytes:.1f} GiB'
+
+
+def format_table(header, rows):
+    """
+    Render rows (lists of str) as a plain text table with aligned columns.
+    """
+    widths = [max(len(str(cell)) for cell in column) for column in zip(header, *rows)]
+    lines = [
+        '  '.join(str(cell).rjust(width) for cell, width in zip(row, widths))
+        for row in [header] + rows
+    ]
+    lines.insert(1, '  '.join('-' * width for width in widths))
+    return '\n'.join(lines)
+
+
+def print_results(results):
+    header = ['day', 'part', 'runs', 'min', 'median', 'p95', 'alloc peak', 'peak rss']
+    rows = [
+        [
+            r['day'], r['part'], r['runs'],
+            format_seconds(r['min']), format_seconds(r['median']), format_seconds(r['p95']),
+            format_bytes(r['alloc_peak']), format_bytes(r['peak_rss']),
+        ]
+        for r in results
+    ]
+    print(format_table(header, rows))
+
+
+def git_commit():
+    """
+    Commit hash of the checked out code, or None if it can't be determined.
+    """
+    try:
+        out = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def write_json(results, fname):
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(fname, 'w') as fp:
+        json.dump(report, fp, indent=2)
+
+
+###############################
+# Command line
+###############################
+
+def positive_int(value):
+    """
+    Argument type for counts that must be at least 1.
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'must be at least 1, got {number}')
+    return number
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m aoc.bench', description='Benchmark the puzzle solutions.')
+    parser.add_argument('days', nargs='*', type=int, help='days to benchmark (default: all)')
+    parser.add_argument('--part', type=int, action='append', help='only benchmark this part (repeatable)')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed runs before measuring (default: 1)')
+    parser.add_argument('--repeat', type=positive_int, default=5, help='maximum number of timed runs (default: 5)')
+    parser.add_argument('--max-time', type=float, default=10.0, help='stop repeating after this many seconds (default: 10)')
+    parser.add_argument('--skip-allocations', action='store_true', help="don't trace allocations")
+    parser.add_argument('--json', metavar='FILE', help='write the results to FILE as JSON')
+    args = parser.parse_args(argv)
+
+    days = args.days or list(day_paths())
+
+    # import the days here as well, only to find out which parts they registered
+    for day in days:
+        load_day(day)
+    parts = [
+        (day, part)
+        for day, part in sorted(registry)
+        if day in days and (not args.part or part in args.part)
+    ]
+
+    results = []
+    for day, part in parts:
+        print(f'Benchmarking day {day} part {part}...', file=sys.stderr)
+        results.append(measure_isolated(
+            day, part,
+            warmup=args.warmup,
+            repeat=args.repeat,
+            max_time=args.max_time,
+            trace_allocations=not args.skip_allocations,
+        ))
+
+    print_results(results)
+    if args.json:
+        write_json(results, args.json)
+
+
+if __name__ == '__main__':
+    # the days register with `aoc.bench`, which is a different module object than `__main__`
+    from aoc import bench
+    bench.main()
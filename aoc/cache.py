@@ -0,0 +1,218 @@
+"""
+On-disk cache for puzzle answers.
+
+An answer is stored under a key that hashes everything it depends on:
+  - the source code of the day's script and of the shared `aoc` package (so
+    any change to a solver, or to a helper it calls, invalidates the answers
+    of that day)
+  - the bytes of the input file
+  - the parameters of the run (day, part and input file name)
+
+So as long as none of these change, a part doesn't need to run again.
+
+Each entry is a small JSON file in `.aoc-cache/` in the repository root.
+The cache is bounded in size: once it grows beyond `max_bytes`, the least
+recently used entries are removed. Entries larger than `max_bytes` on their
+own are not stored at all.
+
+Days can also store larger intermediate results (e.g. an index built from the
+input) with `put_artifact`. These live in their own files next to the answers
+and don't count towards `max_bytes`; only the latest one per day and name is
+kept.
+
+Usage (from the repository root):
+
+    python3 -m aoc.cache list       # show all cached answers
+    python3 -m aoc.cache clear      # remove all cached answers
+    python3 -m aoc.cache clear 15   # remove the cached answers (and artifacts) of day 15
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import tempfile
+
+from aoc.days import ROOT, day_paths
+
+CACHE_DIR = os.path.join(ROOT, '.aoc-cache')
+PACKAGE_DIR = os.path.join(ROOT, 'aoc')
+MAX_BYTES = 10 * 1024 * 1024
+
+# returned by `get` when there is no cached answer (None could be a valid answer)
+MISSING = object()
+
+
+def cache_key(day, part, fname=None):
+    """
+    Hash the source of day `day`, the source of the `aoc` package, its input file and the run parameters.
+    """
+    script = day_paths()[day]
+    input_file = os.path.join(os.path.dirname(script), fname or 'input.txt')
+
+    digest = hashlib.sha256()
+    digest.update(f'day={day} part={part} fname={fname}\n'.encode())
+    # the days use the shared helpers of the `aoc` package (e.g. to read their input)
+    for path in [script] + sorted(glob.glob(os.path.join(PACKAGE_DIR, '*.py'))):
+        with open(path, 'rb') as fp:
+            digest.update(fp.read())
+    # some days have their input in the script itself
+    if os.path.exists(input_file):
+        with open(input_file, 'rb') as fp:
+            for chunk in iter(lambda: fp.read(1024 * 1024), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _entry_path(day, part, key, cache_dir):
+    return os.path.join(cache_dir, f'day-{day}-part-{part}-{key}.json')
+
+
+def _artifact_path(day, name, key, cache_dir):
+    return os.path.join(cache_dir, f'day-{day}-{name}-{key}.json')
+
+
+def _write(path, content, cache_dir):
+    os.makedirs(cache_dir, exist_ok=True)
+    # write to a temporary file first, so that readers never see half an entry
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    with os.fdopen(fd, 'w') as fp:
+        fp.write(content)
+    os.replace(tmp_path, path)
+
+
+def get(day, part, key, cache_dir=CACHE_DIR):
+    """
+    Return the cached answer, or `MISSING` if there is none.
+    """
+    path = _entry_path(day, part, key, cache_dir)
+    try:
+        with open(path) as fp:
+            entry = json.load(fp)
+    except (OSError, ValueError):
+        return MISSING
+
+    # mark entry as recently used
+    os.utime(path)
+    return entry['answer']
+
+
+def put(day, part, key, answer, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+    """
+    Store an answer. Answers that can't be stored as JSON, or that are larger
+    than `max_bytes` by themselves, are not cached.
+    Returns True if the answer was stored.
+    """
+    try:
+        content = json.dumps({'day': day, 'part': part, 'answer': answer})
+    except TypeError:
+        return False
+    if len(content.encode()) > max_bytes:
+        return False
+
+    path = _entry_path(day, part, key, cache_dir)
+    _write(path, content, cache_dir)
+
+    evict(max_bytes, cache_dir, keep=path)
+    return True
+
+
+def get_artifact(day, name, key, cache_dir=CACHE_DIR):
+    """
+    Return the artifact `name` of day `day` stored under `key`, or `MISSING` if there is none.
+    """
+    try:
+        with open(_artifact_path(day, name, key, cache_dir)) as fp:
+            return json.load(fp)
+    except (OSError, ValueError):
+        return MISSING
+
+
+def put_artifact(day, name, key, value, cache_dir=CACHE_DIR):
+    """
+    Store the artifact `name` of day `day` under `key`, replacing older versions of it.
+    Artifacts are not subject to the size limit of the answers.
+    """
+    path = _artifact_path(day, name, key, cache_dir)
+    _write(path, json.dumps(value), cache_dir)
+
+    # older versions belong to a previous input or code, they won't be used again
+    for old_path in glob.glob(_artifact_path(day, name, '*', cache_dir)):
+        if old_path != path:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+
+def entries(cache_dir=CACHE_DIR):
+    """
+    List all cached answers as tuples (path, size in bytes, last used), most recently used first.
+    """
+    found = []
+    for path in glob.glob(os.path.join(cache_dir, 'day-*-part-*.json')):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        found.append((path, stat.st_size, stat.st_mtime))
+    return sorted(found, key=lambda entry: entry[2], reverse=True)
+
+
+def evict(max_bytes=MAX_BYTES, cache_dir=CACHE_DIR, keep=None):
+    """
+    Remove the least recently used entries until the cache fits into `max_bytes`.
+    The entry at path `keep` (e.g. the one just written) is never removed.
+    """
+    found = entries(cache_dir)
+    total = sum(size for path, size, _ in found if path == keep)
+    for path, size, _ in found:
+        if path == keep:
+            continue
+        total += size
+        if total > max_bytes:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def clear(days=None, cache_dir=CACHE_DIR):
+    """
+    Remove the answers and artifacts of the given days (or of all days). Returns the number of removed files.
+    """
+    patterns = [f'day-{day}-*.json' for day in days] if days else ['day-*.json']
+    removed = 0
+    for pattern in patterns:
+        for path in glob.glob(os.path.join(cache_dir, pattern)):
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m aoc.cache', description='Inspect or clear the answer cache.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('list', help='show all cached answers')
+    clear_parser = subparsers.add_parser('clear', help='remove cached answers')
+    clear_parser.add_argument('days', nargs='*', type=int, help='only remove the answers of these days')
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        cached = []
+        for path, _, _ in entries():
+            with open(path) as fp:
+                cached.append(json.load(fp))
+        for entry in sorted(cached, key=lambda entry: (entry['day'], str(entry['part']))):
+            answer = str(entry['answer'])
+            if len(answer) > 60:
+                answer = answer[:57] + '...'
+            print(f"day {entry['day']} part {entry['part']}: {answer}")
+    elif args.command == 'clear':
+        removed = clear(args.days)
+        print(f'Removed {removed} cache files')
+
+
+if __name__ == '__main__':
+    main()
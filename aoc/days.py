@@ -0,0 +1,65 @@
+"""
+Discover and import the `day-N/day-N.py` solution scripts.
+
+The scripts are named with a dash, so they can't be imported with a plain
+`import` statement. We load them from their file path instead, under the
+module name `day_N`. As the module name is not `__main__`, importing a day
+does not run its puzzle.
+"""
+
+import glob
+import importlib.util
+import os
+import re
+import sys
+
+# repository root, i.e. the directory that contains all `day-N` directories
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+regex_day = re.compile(r'day-(\d+)\.py$')
+
+
+def day_paths():
+    """
+    Find all solution scripts.
+    Returns a dict that maps the day number (int) to the path of its script.
+    """
+    paths = {}
+    for path in glob.glob(os.path.join(ROOT, 'day-*', 'day-*.py')):
+        match = regex_day.search(path)
+        if match:
+            paths[int(match.group(1))] = path
+    return dict(sorted(paths.items()))
+
+
+def load_day(day):
+    """
+    Import the solution script of day `day` and return the module.
+    Each day is only imported once per process.
+    """
+    name = f'day_{day}'
+    if name in sys.modules:
+        return sys.modules[name]
+
+    path = day_paths()[day]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def call_day(day, name, *args, **kwargs):
+    """
+    Call the function `name` of day `day`.
+
+    The functions of a day can't be sent to worker processes directly: a
+    worker that doesn't share the parent's memory has no way to import the
+    day module by name. Sending `functools.partial(call_day, day, name)`
+    instead works with every process start method.
+    """
+    return getattr(load_day(day), name)(*args, **kwargs)
@@ -0,0 +1,473 @@
+"""
+Generate synthetic puzzle inputs of arbitrary size.
+
+The bundled `input.txt` files are tiny, so they hardly exercise the hot paths
+of the solutions. The generators below produce valid inputs in the exact
+format of each day. They are seeded, so the same (day, size, seed) always
+gives the same input.
+
+Each generator is a Python generator function `fn(size, rng)` which yields
+the input text in chunks, so even huge inputs can be written to disk without
+holding them in memory. What `size` means depends on the day (number of
+lines, records, rows, ...), see `generators` at the end of this file. A few
+days need a minimum size for a valid input, and raise ValueError below it.
+
+Day 15 has no generator: its puzzle input is six numbers and the amount of
+work depends only on the number of turns, which `play` already takes as a
+parameter.
+
+Usage (from the repository root):
+
+    python3 -m aoc.generators 4 1000000 -o passports.txt
+    python3 -m aoc.generators 11 1000 --seed 7 > seats.txt
+"""
+
+import argparse
+import random
+import string
+import sys
+from collections import namedtuple
+from itertools import combinations
+
+
+def _word(rng, min_len=3, max_len=8):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(min_len, max_len)))
+
+
+def _unique_words(rng, count, words_per_name=1):
+    """
+    Generate `count` distinct names, each made of `words_per_name` random words.
+    """
+    names = set()
+    while len(names) < count:
+        names.add(' '.join(_word(rng) for _ in range(words_per_name)))
+    names = sorted(names)
+    rng.shuffle(names)
+    return names
+
+
+def day_1(size, rng, target_sum=2020):
+    """
+    `size` numbers. Exactly one pair and one triplet sum to `target_sum`,
+    all other numbers are larger than `target_sum`.
+    """
+    # plant a pair and a triplet, retry until they don't produce other solutions
+    while True:
+        a = rng.randint(1, target_sum - 1)
+        b, c = rng.sample(range(1, target_sum // 2), 2)
+        small = {a, target_sum - a, b, c, target_sum - b - c}
+        if len(small) < 5 or min(small) < 1:
+            continue
+        pairs = [p for p in combinations(small, 2) if sum(p) == target_sum]
+        triplets = [t for t in combinations(small, 3) if sum(t) == target_sum]
+        if len(pairs) == 1 and len(triplets) == 1:
+            break
+
+    filler = rng.sample(range(target_sum + 1, target_sum + 1 + 10 * size), max(size - 5, 0))
+    numbers = list(small) + filler
+    rng.shuffle(numbers)
+    for num in numbers:
+        yield f'{num}\n'
+
+
+def day_2(size, rng):
+    """
+    `size` lines of password policy and password.
+    """
+    for _ in range(size):
+        length = rng.randint(5, 20)
+        num_1 = rng.randint(1, length - 1)
+        num_2 = rng.randint(num_1 + 1, length)
+        character = rng.choice(string.ascii_lowercase)
+        # use the policy character more often than the others, so that some passwords pass
+        alphabet = string.ascii_lowercase + character * 10
+        password = ''.join(rng.choice(alphabet) for _ in range(length))
+        yield f'{num_1}-{num_2} {character}: {password}\n'
+
+
+def day_3(size, rng, width=31, tree_density=0.2):
+    """
+    A tree map with `size` rows and `width` columns.
+    """
+    for _ in range(size):
+        yield ''.join('#' if rng.random() < tree_density else '.' for _ in range(width)) + '\n'
+
+
+def _passport_value(field, rng):
+    # mostly valid values, with a few invalid ones sprinkled in
+    valid = rng.random() < 0.9
+    if field == 'byr':
+        return str(rng.randint(1920, 2002) if valid else rng.randint(1850, 2050))
+    if field == 'iyr':
+        return str(rng.randint(2010, 2020) if valid else rng.randint(1990, 2030))
+    if field == 'eyr':
+        return str(rng.randint(2020, 2030) if valid else rng.randint(2000, 2040))
+    if field == 'hgt':
+        if valid:
+            return rng.choice((f'{rng.randint(150, 193)}cm', f'{rng.randint(59, 76)}in'))
+        return rng.choice((f'{rng.randint(100, 149)}cm', f'{rng.randint(20, 58)}in', str(rng.randint(50, 200))))
+    if field == 'hcl':
+        value = ''.join(rng.choice('0123456789abcdef') for _ in range(6))
+        return f'#{value}' if valid else value
+    if field == 'ecl':
+        return rng.choice(('amb', 'blu', 'brn', 'gry', 'grn', 'hzl', 'oth') if valid else ('red', 'xry', 'zzz'))
+    if field == 'pid':
+        return ''.join(rng.choice(string.digits) for _ in range(9 if valid else rng.choice((8, 10))))
+    if field == 'cid':
+        return str(rng.randint(10, 350))
+
+
+def day_4(size, rng):
+    """
+    `size` passports, separated by blank lines.
+    Fields are spread over one or more lines, some fields are missing.
+    """
+    all_fields = ['byr', 'iyr', 'eyr', 'hgt', 'hcl', 'ecl', 'pid', 'cid']
+    for idx in range(size):
+        fields = [f for f in all_fields if rng.random() < 0.95]
+        rng.shuffle(fields)
+        pairs = [f'{field}:{_passport_value(field, rng)}' for field in fields]
+        lines = []
+        while pairs:
+            n = rng.randint(1, 4)
+            lines.append(' '.join(pairs[:n]))
+            pairs = pairs[n:]
+        if idx:
+            yield '\n'
+        yield '\n'.join(lines) + '\n'
+
+
+def _boarding_pass(seat_id):
+    row, col = divmod(seat_id, 8)
+    row = format(row, '07b').replace('1', 'B').replace('0', 'F')
+    col = format(col, '03b').replace('1', 'R').replace('0', 'L')
+    return row + col
+
+
+def day_5(size, rng, num_seats=128 * 8):
+    """
+    `size` boarding passes, at least 2 (the neighbours of the free seat).
+    The passes cover a block of consecutive seats with a single free seat in
+    it. A plane only has 1024 seats, so for larger sizes seats repeat.
+    """
+    if size < 2:
+        raise ValueError(f'day 5 needs at least 2 boarding passes, got {size}')
+    block_len = min(size + 1, num_seats - 2)
+    start = rng.randint(1, num_seats - block_len - 1)
+    free_seat = rng.randint(start + 1, start + block_len - 2)
+    seats = [seat for seat in range(start, start + block_len) if seat != free_seat]
+    passes = [seats[i % len(seats)] for i in range(size)]
+    rng.shuffle(passes)
+    for seat_id in passes:
+        yield _boarding_pass(seat_id) + '\n'
+
+
+def day_6(size, rng):
+    """
+    `size` groups of 1-5 people each, separated by blank lines.
+    """
+    for idx in range(size):
+        # pick a common pool of answers per group, so that groups share some answers
+        pool = rng.sample(string.ascii_lowercase, rng.randint(1, 26))
+        people = [
+            ''.join(rng.sample(pool, rng.randint(1, len(pool))))
+            for _ in range(rng.randint(1, 5))
+        ]
+        if idx:
+            yield '\n'
+        yield '\n'.join(people) + '\n'
+
+
+def day_7(size, rng, target_color='shiny gold', max_children=4, num_levels=7):
+    """
+    `size` bag rules. Like the real input, the colours are arranged in
+    `num_levels` levels, and a bag only contains bags of deeper levels.
+    The `target_color` bag always has contents, and about 5% of the bags
+    on the levels above it contain it directly.
+    """
+    colors = _unique_words(rng, size - 1, words_per_name=2)
+    colors = [c for c in colors if c != target_color][:size - 1]
+    target = rng.randint(len(colors) // num_levels, len(colors) // 2)
+    colors.insert(target, target_color)
+
+    num_colors = len(colors)
+    target_level = target * num_levels // num_colors
+    for idx, color in enumerate(colors):
+        level = idx * num_levels // num_colors
+        # index of the first colour on the next level
+        first_child = -(-(level + 1) * num_colors // num_levels)
+        candidates = range(first_child, num_colors)
+
+        num_children = max_children if idx == target else rng.randint(0, max_children)
+        children = rng.sample(candidates, min(num_children, len(candidates)))
+        if level < target_level and target not in children and rng.random() < 0.05:
+            children.append(target)
+        if not children:
+            yield f'{color} bags contain no other bags.\n'
+            continue
+
+        contents = []
+        for child in children:
+            count = rng.randint(1, 5)
+            contents.append(f'{count} {colors[child]} bag{"s" if count > 1 else ""}')
+        yield f'{color} bags contain {", ".join(contents)}.\n'
+
+
+def day_8(size, rng):
+    """
+    A program with `size` instructions which runs into an infinite loop,
+    unless one of its nop instructions is switched to jmp or vice versa.
+    It takes at least 2 instructions: the corrupted jmp and the one it loops back to.
+    """
+    if size < 2:
+        raise ValueError(f'day 8 needs at least 2 instructions, got {size}')
+    # lay out the correct program as blocks of straight code, visited in random order
+    blocks, start = [], 0
+    while start < size:
+        length = min(rng.randint(2, 8), size - start)
+        blocks.append(range(start, start + length))
+        start += length
+    first, rest = blocks[0], blocks[1:]
+    rng.shuffle(rest)
+    path = [idx for block in [first] + rest for idx in block]
+
+    program = [None] * size
+    for pos, idx in enumerate(path):
+        next_idx = path[pos + 1] if pos + 1 < len(path) else size
+        if next_idx != idx + 1:
+            program[idx] = ('jmp', next_idx - idx)
+        elif rng.random() < 0.7:
+            program[idx] = ('acc', rng.randint(-50, 50))
+        else:
+            # nop arguments stay within the program, so they are valid jumps if switched
+            program[idx] = ('nop', rng.randint(-idx, size - 1 - idx))
+
+    # corrupt one instruction of the straight code: a jmp back to an instruction that
+    # has already been executed always loops. Switching it back to nop fixes the program.
+    # It's placed late in the execution path, so run times are comparable between sizes.
+    while True:
+        pos = rng.randint(max(len(path) * 3 // 4, 1), len(path) - 1)
+        idx = path[pos]
+        if program[idx][0] != 'jmp':
+            program[idx] = ('jmp', path[rng.randint(0, pos - 1)] - idx)
+            break
+
+    for cmd, arg in program:
+        yield f'{cmd} {arg:+d}\n'
+
+
+def day_9(size, rng, preamble=25):
+    """
+    `size` numbers, each of which is the sum of two different numbers among
+    its `preamble` predecessors, except one. That invalid number is also the
+    sum of a contiguous range of earlier numbers.
+
+    Note that the numbers necessarily grow exponentially, so beyond ~10^4
+    lines they get hundreds of digits long.
+    """
+    numbers = rng.sample(range(1, 100), preamble)
+    invalid_pos = max(preamble + 1, size * 2 // 3)
+    for pos in range(preamble, size):
+        if pos == invalid_pos:
+            # sum of an early range: smaller than any two of its predecessors, hence invalid
+            start = rng.randint(0, preamble // 2)
+            numbers.append(sum(numbers[start:start + rng.randint(2, preamble // 2)]))
+            continue
+        # adding the smallest numbers keeps the growth as slow as possible
+        window = sorted(set(numbers[-preamble:]))
+        a, b = rng.sample(window[:4], 2)
+        numbers.append(a + b)
+
+    for num in numbers[:size]:
+        yield f'{num}\n'
+
+
+def day_10(size, rng):
+    """
+    `size` distinct adapter joltages, differing by 1 or 3 once sorted.
+    """
+    joltages, jolt = [], 0
+    for _ in range(size):
+        jolt += rng.choice((1, 1, 1, 3))
+        joltages.append(jolt)
+    rng.shuffle(joltages)
+    for jolt in joltages:
+        yield f'{jolt}\n'
+
+
+def day_11(size, rng, floor_density=0.15):
+    """
+    A seat layout of `size` x `size`.
+    """
+    for _ in range(size):
+        yield ''.join('.' if rng.random() < floor_density else 'L' for _ in range(size)) + '\n'
+
+
+def day_12(size, rng):
+    """
+    `size` navigation instructions.
+    """
+    for _ in range(size):
+        action = rng.choice('NSEWLRFFF')
+        if action in 'LR':
+            value = rng.choice((90, 180, 270))
+        else:
+            value = rng.randint(1, 100)
+        yield f'{action}{value}\n'
+
+
+def _primes(limit):
+    sieve = bytearray([1]) * (limit + 1)
+    sieve[:2] = b'\x00\x00'
+    for i in range(2, int(limit ** 0.5) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytearray(len(sieve[i * i::i]))
+    return [i for i, is_prime in enumerate(sieve) if is_prime]
+
+
+def day_13(size, rng):
+    """
+    Departure time and a schedule with `size` slots. Buses have distinct
+    prime ids (so a solution for part 2 exists), all other slots are `x`.
+    """
+    num_busses = max(2, size // 4)
+    primes = _primes(max(1000, num_busses * 20))
+    busses = rng.sample([p for p in primes if p > 10], num_busses)
+    slots = ['x'] * max(size, num_busses)
+    for bus, pos in zip(busses, [0] + rng.sample(range(1, len(slots)), num_busses - 1)):
+        slots[pos] = str(bus)
+    yield f'{rng.randint(1_000_000, 10_000_000)}\n'
+    yield ','.join(slots) + '\n'
+
+
+def day_14(size, rng, mask_every=5):
+    """
+    A program with `size` lines: masks and memory writes.
+    """
+    for idx in range(size):
+        if idx % mask_every == 0:
+            yield 'mask = ' + ''.join(rng.choice('XXXXX01') for _ in range(36)) + '\n'
+        else:
+            yield f'mem[{rng.randint(0, 65535)}] = {rng.randint(0, 2 ** 30)}\n'
+
+
+def day_16(size, rng, num_fields=20, band=100):
+    """
+    Ticket notes with `num_fields` fields and `size` nearby tickets.
+
+    Field `i` accepts the values 1..band*(i+1), and each column contains a
+    value that fits no field below its own. So column/field assignment is
+    unique and can be solved by elimination, as part 2 expects.
+    About 20% of the nearby tickets contain an invalid value.
+    """
+    names = _unique_words(rng, num_fields)
+    names = [f'departure {name}' if i < 6 else name for i, name in enumerate(names)]
+    upper = band * num_fields
+    columns = list(range(num_fields))
+    rng.shuffle(columns)  # columns[position] = field index
+
+    for i, name in enumerate(names):
+        second = upper + 100 + 10 * i
+        yield f'{name}: 1-{band * (i + 1)} or {second}-{second + 5}\n'
+
+    def ticket(force_upper_band=False, invalid=False):
+        values = []
+        for field in columns:
+            low = band * field + 1 if force_upper_band else 1
+            values.append(rng.randint(low, band * (field + 1)))
+        if invalid:
+            values[rng.randrange(num_fields)] = rng.randint(upper + 1, upper + 99)
+        return ','.join(str(v) for v in values)
+
+    yield '\nyour ticket:\n'
+    yield ticket() + '\n'
+    yield '\nnearby tickets:\n'
+    for idx in range(size):
+        yield ticket(force_upper_band=(idx == 0), invalid=(idx > 0 and rng.random() < 0.2)) + '\n'
+
+
+def day_17(size, rng, active_density=0.4):
+    """
+    Initial slice of `size` x `size` cubes.
+    """
+    for _ in range(size):
+        yield ''.join('#' if rng.random() < active_density else '.' for _ in range(size)) + '\n'
+
+
+def _expression(rng, depth=0):
+    terms = []
+    for _ in range(rng.randint(2, 5)):
+        if depth < 3 and rng.random() < 0.25:
+            terms.append(f'({_expression(rng, depth + 1)})')
+        else:
+            terms.append(str(rng.randint(1, 9)))
+    expr = terms[0]
+    for term in terms[1:]:
+        expr += f' {rng.choice("+*")} {term}'
+    return expr
+
+
+def day_18(size, rng):
+    """
+    `size` lines of math homework.
+    """
+    for _ in range(size):
+        yield _expression(rng) + '\n'
+
+
+Generator = namedtuple('Generator', ['fn', 'size_unit', 'sizes'])
+
+# map from day -> generator, what `size` counts and the sizes swept by the scaling benchmark
+generators = {
+    1: Generator(day_1, 'numbers', [125_000, 250_000, 500_000, 1_000_000]),
+    2: Generator(day_2, 'lines', [10_000, 40_000, 160_000, 640_000]),
+    3: Generator(day_3, 'rows', [10_000, 40_000, 160_000, 640_000]),
+    4: Generator(day_4, 'passports', [10_000, 40_000, 160_000, 640_000]),
+    5: Generator(day_5, 'passes', [10_000, 40_000, 160_000, 640_000]),
+    6: Generator(day_6, 'groups', [10_000, 40_000, 160_000, 640_000]),
+    7: Generator(day_7, 'rules', [1_000, 2_000, 4_000, 8_000]),
+    8: Generator(day_8, 'instructions', [1_000, 2_000, 4_000, 8_000]),
+    9: Generator(day_9, 'numbers', [500, 1_000, 2_000, 4_000]),
+    10: Generator(day_10, 'adapters', [1_000, 2_000, 4_000, 8_000]),
+    11: Generator(day_11, 'rows (square layout)', [25, 50, 100, 200]),
+    12: Generator(day_12, 'instructions', [10_000, 40_000, 160_000, 640_000]),
+    13: Generator(day_13, 'schedule slots', [100, 200, 400, 800]),
+    14: Generator(day_14, 'lines', [10_000, 40_000, 160_000, 640_000]),
+    16: Generator(day_16, 'nearby tickets', [1_000, 4_000, 16_000, 64_000]),
+    17: Generator(day_17, 'rows (square slice)', [8, 12, 16, 24]),
+    18: Generator(day_18, 'expressions', [1_000, 4_000, 16_000, 64_000]),
+}
+
+
+def generate(day, size, seed=0):
+    """
+    Yield the chunks of a synthetic input for day `day`.
+    """
+    rng = random.Random(seed)
+    return generators[day].fn(size, rng)
+
+
+def write_input(fname, day, size, seed=0):
+    with open(fname, 'w') as fp:
+        fp.writelines(generate(day, size, seed))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m aoc.generators', description='Generate synthetic puzzle inputs.')
+    parser.add_argument('day', type=int, choices=sorted(generators))
+    parser.add_argument('size', type=int, help='size of the input, see `generators` for its unit per day')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', metavar='FILE', help='write to FILE instead of stdout')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.output:
+            write_input(args.output, args.day, args.size, args.seed)
+        else:
+            sys.stdout.writelines(generate(args.day, args.size, args.seed))
+    except ValueError as error:
+        parser.error(str(error))
+
+
+if __name__ == '__main__':
+    main()
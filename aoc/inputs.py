@@ -0,0 +1,142 @@
+"""
+Reading puzzle inputs.
+
+Every day used to open and read its `input.txt` on its own. The functions
+here do that in one place:
+
+  - `input_path` finds the input file next to the script, no matter from
+    where the script is called
+  - `iter_lines` and `iter_records` lazily walk a memory-mapped file, so
+    even huge (generated) inputs are processed with constant memory
+  - `byte_ranges` splits a file into chunks that can be processed in
+    parallel, by passing each chunk's range to `iter_lines` or `iter_records`
+  - `follow_lines` keeps reading a file while it grows, like `tail -f`
+  - `read_text` returns the whole file, for the days that parse a string
+
+All functions take the file name plus the script it belongs to (`__file__`):
+
+    for line in iter_lines('input.txt', __file__):
+        ...
+"""
+
+import mmap
+import os
+import time
+
+
+def input_path(fname, relative_to=None):
+    """
+    Resolve `fname` relative to the directory of the script `relative_to`.
+    Absolute paths (and calls without `relative_to`) are returned unchanged.
+    """
+    if relative_to is None:
+        return fname
+    return os.path.join(os.path.dirname(os.path.abspath(relative_to)), fname)
+
+
+def read_text(fname='input.txt', relative_to=None):
+    """
+    Read the whole file, without leading/trailing whitespace.
+    """
+    with open(input_path(fname, relative_to), 'r') as fp:
+        return fp.read().strip()
+
+
+def byte_ranges(fname='input.txt', relative_to=None, num_ranges=1):
+    """
+    Split the file into `num_ranges` byte ranges (start, end) of about equal size.
+    The ranges don't respect line (or record) boundaries, `iter_lines` and
+    `iter_records` take care of that.
+    """
+    size = os.path.getsize(input_path(fname, relative_to))
+    bounds = [size * i // num_ranges for i in range(num_ranges + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def iter_lines(fname='input.txt', relative_to=None, start=0, end=None):
+    """
+    Yield the lines of the file one by one, without line breaks.
+
+    With `start` and `end`, only the lines that begin within the byte range
+    [start, end) are read. So ranges that cover the file without overlap
+    (like the ones from `byte_ranges`) yield each line exactly once.
+    """
+    with open(input_path(fname, relative_to), 'rb') as fp:
+        # an empty file can't be memory-mapped
+        if os.fstat(fp.fileno()).st_size == 0:
+            return
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = len(mm) if end is None else min(end, len(mm))
+            if start > 0:
+                # a line that began before `start` belongs to the previous range
+                start = mm.find(b'\n', start - 1) + 1 or len(mm)
+            mm.seek(start)
+            while mm.tell() < end:
+                yield mm.readline().rstrip(b'\r\n').decode()
+
+
+def iter_records(fname='input.txt', relative_to=None, start=0, end=None):
+    """
+    Yield the records of a file in which blank lines separate records.
+    Each record is a string of its lines, joined by line breaks.
+
+    With `start` and `end`, only the records whose first line begins within
+    the byte range [start, end) are read (the last one may extend beyond `end`).
+    So ranges that cover the file without overlap yield each record exactly once.
+    """
+    with open(input_path(fname, relative_to), 'rb') as fp:
+        # an empty file can't be memory-mapped
+        if os.fstat(fp.fileno()).st_size == 0:
+            return
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = len(mm) if end is None else min(end, len(mm))
+            in_previous_record = False
+            if start > 0:
+                # a line that began before `start` belongs to the previous range
+                start = mm.find(b'\n', start - 1) + 1 or len(mm)
+                # ... and so does the rest of a record that such a line is part of
+                previous_line = mm[mm.rfind(b'\n', 0, start - 1) + 1:start]
+                in_previous_record = bool(previous_line.strip())
+            mm.seek(start)
+
+            lines = []
+            while mm.tell() < len(mm):
+                # the next record begins in the next range
+                if not lines and mm.tell() >= end:
+                    break
+                line = mm.readline()
+                if not line.strip():
+                    in_previous_record = False
+                    if lines:
+                        yield '\n'.join(lines)
+                        lines = []
+                elif not in_previous_record:
+                    lines.append(line.rstrip(b'\r\n').decode())
+            if lines:
+                yield '\n'.join(lines)
+
+
+def follow_lines(fname='input.txt', relative_to=None, poll_interval=0.5, stop_at_eof=False):
+    """
+    Yield the lines of the file, and keep waiting for new lines once the end
+    of the file is reached (like `tail -f`). A line is only yielded once it
+    is complete, i.e. its line break has been written.
+
+    With `stop_at_eof=True`, stops at the current end of the file instead.
+    """
+    with open(input_path(fname, relative_to)) as fp:
+        pending = ''
+        while True:
+            line = fp.readline()
+            if not line:
+                if stop_at_eof:
+                    if pending:
+                        yield pending
+                    return
+                time.sleep(poll_interval)
+                continue
+
+            pending += line
+            if pending.endswith('\n'):
+                yield pending.rstrip('\r\n')
+                pending = ''
@@ -0,0 +1,110 @@
+"""
+Run the puzzles of several days at once, in parallel.
+
+Each part that a day registers with `aoc.bench` is one task. The tasks are
+spread over a pool of processes, so on a machine with enough cores the whole
+suite takes about as long as its slowest part (day 15, part 2).
+
+Usage (from the repository root):
+
+    python3 -m aoc.run                # all days, one process per core
+    python3 -m aoc.run 1 5 11         # selected days
+    python3 -m aoc.run 15 --part 1
+    python3 -m aoc.run -j 4           # at most 4 processes
+    python3 -m aoc.run --no-cache     # don't use cached answers
+
+Answers are cached (see `aoc/cache.py`): a part only runs again once the
+code of its day or its input changed.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from aoc import cache
+from aoc.bench import format_seconds, format_table, registry
+from aoc.days import day_paths, load_day
+
+
+def solve(day, part):
+    """
+    Read the input of part `part` of day `day` and solve it.
+    Returns a tuple (answer, setup time, solve time).
+    """
+    load_day(day)
+    start = time.perf_counter()
+    fn = registry[(day, part)]()
+    setup_done = time.perf_counter()
+    answer = fn()
+    return answer, setup_done - start, time.perf_counter() - setup_done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m aoc.run', description='Run the puzzle solutions in parallel.')
+    parser.add_argument('days', nargs='*', type=int, help='days to run (default: all)')
+    parser.add_argument('--part', type=int, action='append', help='only run this part (repeatable)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='number of processes (default: number of cores)')
+    parser.add_argument('--no-cache', action='store_true', help="don't read or write cached answers")
+    args = parser.parse_args(argv)
+
+    days = args.days or list(day_paths())
+    for day in days:
+        if day not in day_paths():
+            parser.error(f'there is no solution for day {day}')
+        # importing the day registers its parts
+        load_day(day)
+    tasks = [
+        (day, part)
+        for day, part in sorted(registry)
+        if day in days and (not args.part or part in args.part)
+    ]
+
+    start = time.perf_counter()
+    results = {}
+    failed = set()
+    keys = {}
+    if not args.no_cache:
+        for day, part in tasks:
+            keys[(day, part)] = cache.cache_key(day, part)
+            answer = cache.get(day, part, keys[(day, part)])
+            if answer is not cache.MISSING:
+                results[(day, part)] = (answer, None, None)
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {
+            pool.submit(solve, day, part): (day, part)
+            for day, part in tasks
+            if (day, part) not in results
+        }
+        for future in as_completed(futures):
+            day, part = futures[future]
+            try:
+                results[(day, part)] = future.result()
+            except Exception as e:
+                print(f'Day {day} part {part} failed: {type(e).__name__}: {e}', file=sys.stderr)
+                results[(day, part)] = ('error', None, None)
+                failed.add((day, part))
+                continue
+            if not args.no_cache:
+                cache.put(day, part, keys[(day, part)], results[(day, part)][0])
+    wall_time = time.perf_counter() - start
+
+    rows = [
+        [
+            day, part, answer,
+            format_seconds(setup) if setup is not None else '-',
+            format_seconds(solved) if solved is not None else ('-' if (day, part) in failed else 'cached'),
+        ]
+        for (day, part), (answer, setup, solved) in sorted(results.items())
+    ]
+    print(format_table(['day', 'part', 'answer', 'setup', 'solve'], rows))
+
+    total = sum(setup + solved for _, setup, solved in results.values() if setup is not None)
+    print()
+    print(f'Wall time: {format_seconds(wall_time)} (sum of all parts: {format_seconds(total)})')
+
+
+if __name__ == '__main__':
+    main()
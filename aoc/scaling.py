@@ -0,0 +1,126 @@
+"""
+Scaling benchmarks: run the puzzle solutions on generated inputs of growing size.
+
+For every day and part, the median run time is measured for each size of a
+sweep (by default the sizes listed in `aoc.generators.generators`). From these
+measurements we estimate the empirical complexity: the slope `k` of
+log(time) over log(size), i.e. time grows like size^k.
+
+Usage (from the repository root):
+
+    python3 -m aoc.scaling                          # all days with a generator
+    python3 -m aoc.scaling 4 7                      # selected days
+    python3 -m aoc.scaling 2 --sizes 1000 10000 100000 --json scaling.json
+"""
+
+import argparse
+import math
+import os
+import sys
+import tempfile
+
+from aoc.bench import format_bytes, format_seconds, format_table, measure_isolated, positive_int, registry, write_json
+from aoc.days import load_day
+from aoc.generators import generators, write_input
+
+
+def fit_exponent(sizes, times):
+    """
+    Least squares fit of log(time) = k * log(size) + c. Returns k,
+    or None if there are fewer than two measurements.
+    """
+    if len(sizes) < 2:
+        return None
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(t, 1e-9)) for t in times]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    cov_xy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    return cov_xy / var_x
+
+
+def sweep(day, part, sizes, input_dir, seed=0, repeat=3, max_time=10.0):
+    """
+    Measure part `part` of day `day` for each size in `sizes`.
+    Stops early once a single run takes longer than `max_time` seconds,
+    as larger inputs would only take longer still.
+    """
+    points = []
+    for size in sizes:
+        fname = os.path.join(input_dir, f'day-{day}-{size}-{seed}.txt')
+        if not os.path.exists(fname):
+            write_input(fname, day, size, seed)
+
+        result = measure_isolated(
+            day, part,
+            fname=fname,
+            warmup=0,
+            repeat=repeat,
+            max_time=max_time,
+            trace_allocations=False
+        )
+        result['size'] = size
+        points.append(result)
+
+        if result['min'] > max_time:
+            break
+
+    return points
+
+
+def print_sweep(day, part, points):
+    unit = generators[day].size_unit
+    exponent = fit_exponent([p['size'] for p in points], [p['median'] for p in points])
+    rows = [
+        [p['size'], format_seconds(p['median']), format_bytes(p['peak_rss'])]
+        for p in points
+    ]
+    print(f'Day {day} part {part}: size in {unit}')
+    print(format_table(['size', 'median', 'peak rss'], rows))
+    if exponent is not None:
+        print(f'Empirical complexity: O(n^{exponent:.2f})')
+    print()
+    return exponent
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m aoc.scaling', description='Benchmark the solutions on growing inputs.')
+    parser.add_argument('days', nargs='*', type=int, help='days to benchmark (default: all days with a generator)')
+    parser.add_argument('--part', type=int, action='append', help='only benchmark this part (repeatable)')
+    parser.add_argument('--sizes', type=int, nargs='+', help='input sizes to sweep (default: per day)')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the input generators (default: 0)')
+    parser.add_argument('--repeat', type=positive_int, default=3, help='maximum number of timed runs per size (default: 3)')
+    parser.add_argument('--max-time', type=float, default=10.0, help='stop the sweep once a run takes longer (default: 10)')
+    parser.add_argument('--json', metavar='FILE', help='write the results to FILE as JSON')
+    args = parser.parse_args(argv)
+
+    days = args.days or list(generators)
+    for day in days:
+        if day not in generators:
+            parser.error(f'there is no input generator for day {day}')
+        load_day(day)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix='aoc-scaling-') as input_dir:
+        for day, part in sorted(registry):
+            if day not in days or (args.part and part not in args.part):
+                continue
+            print(f'Sweeping day {day} part {part}...', file=sys.stderr)
+            points = sweep(
+                day, part,
+                sizes=args.sizes or generators[day].sizes,
+                input_dir=input_dir,
+                seed=args.seed,
+                repeat=args.repeat,
+                max_time=args.max_time
+            )
+            exponent = print_sweep(day, part, points)
+            results.append({'day': day, 'part': part, 'exponent': exponent, 'points': points})
+
+    if args.json:
+        write_json(results, args.json)
+
+
+if __name__ == '__main__':
+    # the days register with `aoc.bench`, this module only reads the registry
+    main()
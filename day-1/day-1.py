@@ -8,30 +8,290 @@ that sum to 2020 and prints the product of those two numbers.
 Part 2: 
 From a given list of numbers (`input.txt`), finds the THREE numbers
 that sum to 2020 and print their product.
+
+Implementation notes:
+Both parts use `find_k_sum`, which finds any number of values that sum to
+a target. On the sorted list of numbers, two pointers find a pair in O(n),
+so a triplet takes O(n^2). With NumPy and many numbers, the innermost pair
+search is vectorized instead: the complements of all numbers are looked up
+with a single `searchsorted`. For four or more numbers, sums of pairs (or
+larger groups) are matched against each other ("meet in the middle"), as long
+as the table of those sums stays reasonably small.
 """
 
-from itertools import product
-from timeit import timeit
+import os
+import sys
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from functools import reduce
+from itertools import combinations, islice
+
+# make the shared `aoc` package importable, no matter from where this script is called
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aoc import bench
+from aoc.inputs import iter_lines
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional, it only speeds up `find_k_sum` and `find_pairs`
+    np = None
+
+# below this many numbers, the pure Python sweep is faster than NumPy
+NUMPY_MIN_NUMBERS = 1000
+# meet in the middle is only picked by default if it stores at most this many sums
+MEET_MAX_COMBINATIONS = 1_000_000
 
 
 def read_numbers(fname='input.txt'):
     """
-    Read numbers from file `fname` and return as a set of integers.
+    Read numbers from file `fname` and return them as a sorted list of integers.
+    """
+    # a list rather than a set: a number that occurs twice may be used twice
+    return sorted(int(num) for num in iter_lines(fname, __file__))
+
+
+###############################
+# k-sum engine
+###############################
+
+def _two_sum(numbers, start, target_sum):
+    """
+    Yield all distinct pairs in the sorted list `numbers[start:]` that sum to `target_sum`.
+    Two pointers walk towards each other from both ends: O(n).
+    """
+    lo, hi = start, len(numbers) - 1
+    while lo < hi:
+        pair_sum = numbers[lo] + numbers[hi]
+        if pair_sum < target_sum:
+            lo += 1
+        elif pair_sum > target_sum:
+            hi -= 1
+        else:
+            yield numbers[lo], numbers[hi]
+            # skip duplicates, so that each pair of values is only reported once
+            lo += 1
+            while lo < hi and numbers[lo] == numbers[lo - 1]:
+                lo += 1
+            hi -= 1
+
+
+def _two_sum_numpy(numbers, start, target_sum):
+    """
+    Vectorized `_two_sum` on a sorted NumPy array `numbers`: the complements of
+    all numbers are looked up at once. Yields the pairs in the same order.
+    """
+    rest = numbers[start:]
+    complements = target_sum - rest
+    # index of the last number <= complement
+    partner = np.searchsorted(rest, complements, side='right') - 1
+    # only the first of equal numbers can start a pair, and its partner has to come after it
+    first = np.ones(len(rest), dtype=bool)
+    first[1:] = rest[1:] != rest[:-1]
+    found = first & (partner > np.arange(len(rest))) & (rest[np.maximum(partner, 0)] == complements)
+    for idx in np.flatnonzero(found):
+        yield int(rest[idx]), int(complements[idx])
+
+
+def _k_sum_sweep(numbers, start, k, target_sum, two_sum=_two_sum):
+    """
+    Yield all distinct combinations of `k` numbers in the sorted list `numbers[start:]`
+    that sum to `target_sum`: fix the smallest number, then solve for k-1. O(n^(k-1)).
+    The pairs are found with `two_sum(numbers, start, target_sum)`.
+    """
+    if k == 2:
+        yield from two_sum(numbers, start, target_sum)
+        return
+
+    n = len(numbers)
+    largest = sum(numbers[n - k + 1:])
+    for i in range(start, n - k + 1):
+        num = numbers[i]
+        if i > start and num == numbers[i - 1]:
+            continue
+        # the list is sorted: the k smallest numbers from here on are already too large
+        if sum(numbers[i:i + k]) > target_sum:
+            break
+        # ... or this number plus the k-1 largest numbers is still too small
+        if num + largest < target_sum:
+            continue
+        for rest in _k_sum_sweep(numbers, i + 1, k - 1, target_sum - num, two_sum):
+            yield (num,) + rest
+
+
+def _k_sum_meet_in_the_middle(numbers, k, target_sum):
+    """
+    Yield all combinations of `k` numbers in the sorted list `numbers` that sum to
+    `target_sum`, by combining the sums of k//2 numbers with the sums of the
+    remaining numbers. O(n^ceil(k/2)) time, but also O(n^(k//2)) memory:
+    all n choose k//2 sums are stored, even if only the first solution is
+    needed (for k=4 and 10^5 numbers, that's 5 * 10^9 of them).
+    """
+    half = k // 2
+
+    # map from sum -> index combinations of the left half
+    left_sums = defaultdict(list)
+    for left in combinations(range(len(numbers)), half):
+        left_sums[sum(numbers[i] for i in left)].append(left)
+
+    for right in combinations(range(len(numbers)), k - half):
+        right_sum = sum(numbers[i] for i in right)
+        for left in left_sums.get(target_sum - right_sum, ()):
+            # each combination of indices is split exactly once: all left indices come first
+            if left[-1] < right[0]:
+                yield tuple(numbers[i] for i in left + right)
+
+
+def _num_combinations(n, r):
+    # math.comb needs Python 3.8
+    return reduce(lambda count, i: count * (n - i) // (i + 1), range(r), 1)
+
+
+def find_k_sum(numbers, k, target_sum, find_all=False, method=None):
+    """
+    Find `k` numbers from `numbers` that sum to `target_sum`.
+    Every number can be used once (so a number that appears twice can be used twice).
+
+    Returns the numbers as a sorted tuple, or None if there is no solution.
+    With `find_all=True`, returns a list of all distinct solutions instead.
+
+    `method` is one of
+      - 'sweep': sorted two-pointer sweeps, O(n^(k-1))
+      - 'numpy': the same sweeps, with a vectorized search for the last two numbers
+      - 'meet': meet in the middle, O(n^ceil(k/2)), but it stores n choose k//2 sums
+    By default, k > 3 meets in the middle if that takes at most
+    `MEET_MAX_COMBINATIONS` sums. Otherwise, the sweeps use NumPy if it's
+    installed and there are at least `NUMPY_MIN_NUMBERS` numbers.
+    """
+    numbers = sorted(numbers)
+    if method is None:
+        if k > 3 and _num_combinations(len(numbers), k // 2) <= MEET_MAX_COMBINATIONS:
+            method = 'meet'
+        elif np is not None and len(numbers) >= NUMPY_MIN_NUMBERS:
+            method = 'numpy'
+        else:
+            method = 'sweep'
+
+    if k < 1 or k > len(numbers):
+        solutions = iter(())
+    elif k == 1:
+        solutions = iter([(target_sum,)] if target_sum in numbers else [])
+    elif method == 'sweep':
+        solutions = _k_sum_sweep(numbers, 0, k, target_sum)
+    elif method == 'numpy':
+        if np is None:
+            raise ValueError('method=numpy needs NumPy')
+        array = np.array(numbers, dtype=np.int64)
+        solutions = _k_sum_sweep(numbers, 0, k, target_sum,
+                                 lambda _, start, pair_sum: _two_sum_numpy(array, start, pair_sum))
+    elif method == 'meet':
+        solutions = _k_sum_meet_in_the_middle(numbers, k, target_sum)
+    else:
+        raise ValueError(f'Unknown method: {method}')
+
+    if find_all:
+        # meet in the middle may find the same values at different indices
+        return sorted(set(solutions))
+    return next(solutions, None)
+
+
+def _find_pairs_numpy(numbers, targets, max_cells=1 << 22):
+    """
+    Vectorized `find_pairs` on a sorted NumPy array `numbers`.
+
+    For a chunk of targets, compute the complement `target - num` of every
+    number at once (a targets x numbers matrix) and look all complements up
+    with a single `searchsorted`. Chunks hold at most `max_cells` cells.
+    """
+    n = len(numbers)
+    own_index = np.arange(n)
+    rows_per_chunk = max(1, max_cells // n)
+
+    pairs = []
+    for start in range(0, len(targets), rows_per_chunk):
+        complements = targets[start:start + rows_per_chunk, None] - numbers[None, :]
+        # index of the first number >= complement
+        partner = np.searchsorted(numbers, complements)
+        # a number can't be its own partner, but an equal number right after it can
+        partner = np.where(partner == own_index, partner + 1, partner)
+        found = (partner < n) & (numbers[np.minimum(partner, n - 1)] == complements)
+
+        # first (= smallest) number that has a partner, per target
+        has_pair = found.any(axis=1)
+        first = found.argmax(axis=1)
+        for row, col in enumerate(first):
+            if has_pair[row]:
+                num, partner_num = int(numbers[col]), int(complements[row, col])
+                pairs.append((min(num, partner_num), max(num, partner_num)))
+            else:
+                pairs.append(None)
+
+    return pairs
+
+
+def _find_pairs_hash(numbers, targets):
     """
-    with open(fname) as fp:
-        # we use a set: efficient for quick lookup, and we don't care about order or duplicates
-        numbers = set(int(num) for num in fp.readlines())
-    return numbers
+    `find_pairs` with one hash lookup per number: for each target, walk up the
+    sorted numbers until one of them has its complement in the multiset.
+    """
+    counts = Counter(numbers)
+    # distinct values in ascending order, so that the first pair found has the smallest number
+    values = sorted(counts)
+
+    pairs = []
+    for target_sum in targets:
+        pair = None
+        # numbers below `target_sum - largest` have no partner, skip them
+        start = bisect_left(values, target_sum - values[-1]) if values else 0
+        for num in islice(values, start, None):
+            complement = target_sum - num
+            if complement < num:
+                break
+            # a number can only be its own partner if it occurs twice
+            if counts.get(complement, 0) > (complement == num):
+                pair = (num, complement)
+                break
+        pairs.append(pair)
+    return pairs
+
+
+def find_pairs(numbers, targets, vectorized=False):
+    """
+    Find a pair of numbers for each of many targets.
+
+    Returns a list with one entry per target: the pair as a sorted tuple,
+    or None if no two numbers sum to that target. The pair with the
+    smallest possible number is returned.
+
+    By default, each target walks up the sorted numbers with one hash lookup
+    each, from the smallest number that can have a partner, and stops at the
+    first number whose complement is there.
+    With `vectorized=True` (needs NumPy), the complements of all numbers are
+    looked up for every target instead, without stopping early. That is only
+    faster if most targets have no pair at all: for 10^5 numbers and 1000
+    such targets it took 4.3 s instead of 6.0 s, but 4.6 s instead of 0.2 s
+    when the targets had pairs.
+    """
+    targets = list(targets)
+    if not vectorized or len(numbers) < 2 or not targets:
+        return _find_pairs_hash(numbers, targets)
+    if np is None:
+        raise ValueError('vectorized=True needs NumPy')
+    return _find_pairs_numpy(np.array(sorted(numbers), dtype=np.int64), np.array(targets, dtype=np.int64))
+
+
+def multiply(numbers):
+    return reduce(lambda a, b: a * b, numbers)
+
 
 # Part 1
 def find_pair(numbers, target_sum):
     """
     Find the two numbers that sum to `target_sum` and return their product.
     """
-    for num in numbers:
-        partner_num = target_sum - num
-        if partner_num in numbers:
-            return num * partner_num
+    pair = find_k_sum(numbers, 2, target_sum)
+    return multiply(pair) if pair else None
 
 
 # Part 2
@@ -39,28 +299,84 @@ def find_triplet(numbers, target_sum):
     """
     Find the three numbers that sum to `target_sum` and return their product.
     """
-    # iterate through all pair combinations (cartesian product), so that we don't need to nest 2 loops
-    for num_1, num_2 in product(numbers, numbers):
-        partner_num = target_sum - num_2 - num_1
+    triplet = find_k_sum(numbers, 3, target_sum)
+    return multiply(triplet) if triplet else None
+
+
+def test_find_k_sum():
+    numbers = [1721, 979, 366, 299, 675, 1456]
+    assert find_pair(numbers, 2020) == 514579
+    assert find_triplet(numbers, 2020) == 241861950
+
+    # both methods find the same solutions
+    for k in range(1, 6):
+        for target_sum in (2020, 3000, 3361):
+            assert find_k_sum(numbers, k, target_sum, find_all=True, method='sweep') \
+                == find_k_sum(numbers, k, target_sum, find_all=True, method='meet')
+
+    # a number can only be used as often as it occurs
+    assert find_k_sum([1010, 5], 2, 2020) is None
+    assert find_k_sum([1010, 1010, 5], 2, 2020) == (1010, 1010)
+    assert find_k_sum([1, 1, 1, 2, 2], 3, 4, find_all=True) == [(1, 1, 2)]
+
+    # negative numbers
+    assert find_k_sum([-5, 3, 10, -2, 7], 3, 0, find_all=True) == [(-5, -2, 7)]
+    assert find_k_sum([-5, 3, 10, -2, 7], 4, 15, find_all=True) == [(-5, 3, 7, 10)]
+
+    # no solution
+    assert find_k_sum(numbers, 4, 1) is None
+    assert find_k_sum(numbers, 7, 2020) is None
+
+    if np is not None:
+        # duplicates and negative numbers, so that many combinations share their values
+        many = [(i * 7919) % 601 - 300 for i in range(1500)]
+        for k in range(2, 5):
+            for target_sum in (0, 17, 850, 2000):
+                assert find_k_sum(many, k, target_sum, method='numpy') \
+                    == find_k_sum(many, k, target_sum, method='sweep')
+        for target_sum in (0, 17, 598, 600):
+            assert find_k_sum(many, 2, target_sum, find_all=True, method='numpy') \
+                == find_k_sum(many, 2, target_sum, find_all=True, method='sweep')
+        assert find_k_sum(numbers, 3, 2020, find_all=True, method='numpy') == [(366, 675, 979)]
+
+
+def test_find_pairs():
+    numbers = [1721, 979, 366, 299, 675, 1456, 1010, 1010]
+    targets = [2020, 1345, 2, 4040, 1654]
+    assert find_pairs(numbers, targets) == [(299, 1721), (366, 979), None, None, (675, 979)]
+    assert find_pairs(numbers, targets) == [find_k_sum(numbers, 2, target_sum) for target_sum in targets]
+    assert find_pairs([1010, 5], [2020, 1015]) == [None, (5, 1010)]
+    assert find_pairs([1010, 1010, 5], [2020]) == [(1010, 1010)]
+    assert find_pairs([], [1]) == [None]
+    assert find_pairs([5, 1], [4000, 2, 6]) == [None, None, (1, 5)]
+
+    if np is not None:
+        for targets_ in (targets, [2020, 2, 6, 3000]):
+            assert find_pairs(numbers, targets_, vectorized=True) == find_pairs(numbers, targets_)
+
+
+# Benchmarks (run with `python3 -m aoc.bench 1` from the repository root)
+@bench.register(day=1, part=1)
+def bench_part_1(fname='input.txt'):
+    numbers = read_numbers(fname)
+    return lambda: find_pair(numbers, 2020)
+
+
+@bench.register(day=1, part=2)
+def bench_part_2(fname='input.txt'):
+    numbers = read_numbers(fname)
+    return lambda: find_triplet(numbers, 2020)
 
-        # leave early if partner would be negative (only tiny speedup, but still)
-        if partner_num < 0:
-            continue
 
-        if partner_num in numbers:
-            return partner_num * num_1 * num_2
-                
 if __name__ == "__main__":
+    test_find_k_sum()
+    test_find_pairs()
+
     target_sum = 2020
     numbers = read_numbers()
-    
-    num_runs = 1000
+
     print("Part 1")
     print(find_pair(numbers, target_sum))
-    timed = timeit('find_pair(numbers, target_sum)', globals=globals(), number=num_runs)
-    print(f'{timed / num_runs * 1_000:.6f} microsec avg')
 
     print('Part 2')
     print(find_triplet(numbers, target_sum))
-    timed = timeit('find_triplet(numbers, target_sum)', globals=globals(), number=num_runs)
-    print(f'{timed / num_runs * 1_000:.6f} microsec avg')
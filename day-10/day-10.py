@@ -1,15 +1,17 @@
 import os
+import sys
 from collections import Counter
 from functools import reduce
 
+# make the shared `aoc` package importable, no matter from where this script is called
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aoc import bench
+from aoc.inputs import read_text
+
 
 def read_file(fname='input.txt'):
-    fname = os.path.join(
-        os.path.dirname(__file__),
-        fname
-    )
-    with open(fname, 'r') as fp:
-        return fp.read().strip()
+    return read_text(fname, __file__)
 
 
 def parse_input(content: str):
@@ -71,6 +73,25 @@ def count_chain_combinations(
     return num_combinations[adapters[0]]
 
 
+# Benchmarks (run with `python3 -m aoc.bench 10` from the repository root)
+@bench.register(day=10, part=1)
+def bench_part_1(fname='input.txt'):
+    adapters = parse_input(read_file(fname))
+
+    def solve():
+        # both parts modify the list of adapters, so each run gets a fresh copy
+        diffs = find_adapter_chain_diffs(list(adapters))
+        return diffs[1] * diffs[3]
+
+    return solve
+
+
+@bench.register(day=10, part=2)
+def bench_part_2(fname='input.txt'):
+    adapters = parse_input(read_file(fname))
+    return lambda: count_chain_combinations(list(adapters))
+
+
 def test_all():
     test_str_1 = """16
 10
@@ -1,18 +1,20 @@
 import os
+import sys
 from copy import deepcopy
 
+# make the shared `aoc` package importable, no matter from where this script is called
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aoc import bench
+from aoc.inputs import read_text
+
 EMPTY = 'L'
 OCCUPIED = '#'
 FLOOR = '.'
 
 
 def read_file(fname='input.txt'):
-    fname = os.path.join(
-        os.path.dirname(__file__),
-        fname
-    )
-    with open(fname, 'r') as fp:
-        return fp.read().strip()
+    return read_text(fname, __file__)
 
 def parse_input(contents):
     return [list(line) for line in contents.strip().split('\n')]
@@ -147,6 +149,19 @@ def step_until_convergence(plan, neighborhood_fn, empty_threshold=4, log=True):
     return sum([len(list(filter(lambda seat: seat == OCCUPIED, row))) for row in plan])
 
 
+# Benchmarks (run with `python3 -m aoc.bench 11` from the repository root)
+@bench.register(day=11, part=1)
+def bench_part_1(fname='input.txt'):
+    plan = parse_input(read_file(fname))
+    return lambda: step_until_convergence(plan, neighborhood_fn=eight_neighborhood, log=False)
+
+
+@bench.register(day=11, part=2)
+def bench_part_2(fname='input.txt'):
+    plan = parse_input(read_file(fname))
+    return lambda: step_until_convergence(plan, neighborhood_fn=visible_neighborhood, empty_threshold=5, log=False)
+
+
 def test_plan_coords():
     coords = plan_coords(height=4, width=5)
     assert len(list(coords)) == 4 * 5
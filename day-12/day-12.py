@@ -1,4 +1,11 @@
 import os
+import sys
+
+# make the shared `aoc` package importable, no matter from where this script is called
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aoc import bench
+from aoc.inputs import read_text
 
 # Action N means to move north by the given value.
 # Action S means to move south by the given value.
@@ -33,9 +40,7 @@ ANGLE_TO_VECTOR = {
 }
 
 def read_file(fname='input.txt'):
-    fname = os.path.join(os.path.dirname(__file__), fname)
-    with open(fname, 'r') as fp:
-        return fp.read().strip()
+    return read_text(fname, __file__)
 
 
 def parse_input(contents):
@@ -120,6 +125,19 @@ def dist(pos_a, pos_b):
     return sum([abs(a - b) for a, b in zip(pos_a, pos_b)])
 
 
+# Benchmarks (run with `python3 -m aoc.bench 12` from the repository root)
+@bench.register(day=12, part=1)
+def bench_part_1(fname='input.txt'):
+    actions = parse_input(read_file(fname))
+    return lambda: dist((0, 0), run(actions, (0, 0)))
+
+
+@bench.register(day=12, part=2)
+def bench_part_2(fname='input.txt'):
+    actions = parse_input(read_file(fname))
+    return lambda: dist((0, 0), run(actions, (0, 0), waypoint=(-1, 10)))
+
+
 def test_all():
     test_contents = """F10
 N3
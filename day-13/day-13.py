@@ -9,12 +9,17 @@ https://en.wikipedia.org/wiki/Chinese_remainder_theorem#Search_by_sieving
 """
 
 import os
+import sys
+
+# make the shared `aoc` package importable, no matter from where this script is called
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aoc import bench
+from aoc.inputs import read_text
 
 
 def read_file(fname='input.txt'):
-    fname = os.path.join(os.path.dirname(__file__), fname)
-    with open(fname, 'r') as fp:
-        return fp.read().strip()
+    return read_text(fname, __file__)
 
 
 def parse_input(contents):
@@ -72,6 +77,25 @@ def find_t(busses):
     return t
 
 
+# Benchmarks (run with `python3 -m aoc.bench 13` from the repository root)
+@bench.register(day=13, part=1)
+def bench_part_1(fname='input.txt'):
+    departure, busses = parse_input(read_file(fname))
+    bus_ids = list(busses.values())
+
+    def solve():
+        bus, wait = pick_bus(departure, bus_ids)
+        return bus * wait
+
+    return solve
+
+
+@bench.register(day=13, part=2)
+def bench_part_2(fname='input.txt'):
+    _, busses = parse_input(read_file(fname))
+    return lambda: find_t(busses)
+
+
 def test_all():
     test_str = """939
     7,13,x,x,59,x,31,19"""
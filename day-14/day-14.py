@@ -1,14 +1,19 @@
 import re
 import os
+import sys
+
+# make the shared `aoc` package importable, no matter from where this script is called
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aoc import bench
+from aoc.inputs import read_text
 
 
 regex_mem = re.compile(r'mem\[(\d+)\] = (\d+)')
 
 
 def read_file(fname='input.txt'):
-    fname = os.path.join(os.path.dirname(__file__), fname)
-    with open(fname, 'r') as fp:
-        return fp.read().strip()
+    return read_text(fname, __file__)
 
 
 def parse_mask(mask):
@@ -18,7 +23,6 @@ def parse_mask(mask):
 
 
 def parse_input(s):
-    print('ok')
     output = []
     for line in s.strip().split('\n'):
         line = line.strip()
@@ -69,6 +73,13 @@ def run(program):
     return sum(mem.values())
 
 
+# Benchmarks (run with `python3 -m aoc.bench 14` from the repository root)
+@bench.register(day=14, part=1)
+def bench_part_1(fname='input.txt'):
+    program = parse_input(read_file(fname))
+    return lambda: run(program)
+
+
 def test_apply():
     mask = {0: 0}  # force LSB to zero
     value = 1  # 0001
@@ -1,5 +1,12 @@
+import os
+import sys
 from collections import defaultdict
 
+# make the shared `aoc` package importable, no matter from where this script is called
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aoc import bench
+
 
 def play(sequence, final_turn=2020, log_every=1_000_000):
 
@@ -25,6 +32,21 @@ def play(sequence, final_turn=2020, log_every=1_000_000):
     return number
 
 
+starting_numbers = [0, 3, 1, 6, 7, 5]
+
+
+# Benchmarks (run with `python3 -m aoc.bench 15` from the repository root)
+@bench.register(day=15, part=1)
+def bench_part_1():
+    # `play` consumes the sequence, so each run gets a fresh copy
+    return lambda: play(list(starting_numbers))
+
+
+@bench.register(day=15, part=2)
+def bench_part_2():
+    return lambda: play(list(starting_numbers), final_turn=30_000_000, log_every=float('inf'))
+
+
 def test():
     # Tests part 1
     assert play([0, 3, 6]) == 436
@@ -38,11 +60,11 @@ def test():
 
 def main():
     print('Part 1')
-    result = play([0,3,1,6,7,5])
+    result = play(list(starting_numbers))
     print(result)
 
     print('Part 2')
-    result = play([0,3,1,6,7,5], final_turn=30_000_000)
+    result = play(list(starting_numbers), final_turn=30_000_000)
     print(result)
 
 
@@ -1,8 +1,15 @@
 import os
 import re
+import sys
 from collections import defaultdict
 from functools import reduce
 
+# make the shared `aoc` package importable, no matter from where this script is called
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aoc import bench
+from aoc.inputs import read_text
+
 test_str = """class: 1-3 or 5-7
 row: 6-11 or 33-44
 seat: 13-40 or 45-50
@@ -32,9 +39,7 @@ nearby tickets:
 
 
 def read_file(fname='input.txt'):
-    fname = os.path.join(os.path.dirname(__file__), fname)
-    with open(fname, 'r') as fp:
-        return fp.read().strip()
+    return read_text(fname, __file__)
 
 
 def parse_input(s):
@@ -125,6 +130,29 @@ def match_fields(tickets, rules):
     return final_mapping
 
 
+def multiply_departure_fields(mapping, my_ticket):
+    """
+    Multiply the values of all fields on `my_ticket` whose name starts with "departure".
+    """
+    indices = [idx for idx, field in mapping.items() if field.startswith('departure')]
+    values = [my_ticket[idx] for idx in indices]
+    return reduce(lambda a, b: a * b, values)
+
+
+# Benchmarks (run with `python3 -m aoc.bench 16` from the repository root)
+@bench.register(day=16, part=1)
+def bench_part_1(fname='input.txt'):
+    rules, tickets = parse_input(read_file(fname))
+    return lambda: check_tickets(rules, tickets)[0]
+
+
+@bench.register(day=16, part=2)
+def bench_part_2(fname='input.txt'):
+    rules, tickets = parse_input(read_file(fname))
+    _, valid_tickets = check_tickets(rules, tickets)
+    return lambda: multiply_departure_fields(match_fields(valid_tickets, rules), tickets[0])
+
+
 def test():
     # part 1
     rules, tickets = parse_input(test_str)
@@ -150,10 +178,7 @@ def main():
 
     print('Part 2')
     mapping = match_fields(valid_tickets, rules)
-    indices = [idx for idx, field in mapping.items() if field.startswith('departure')]
-    my_ticket = tickets[0]
-    values = [my_ticket[idx] for idx in indices]
-    result = reduce(lambda a, b: a * b, values)
+    result = multiply_departure_fields(mapping, my_ticket=tickets[0])
     print(result)
     
 
@@ -17,13 +17,25 @@ an index lookup, I think it's fine. For a large point cloud you
 would obviously make this a little smarter and omptimized.
 """
 
+import os
+import sys
 from itertools import product
 
+# make the shared `aoc` package importable, no matter from where this script is called
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aoc import bench
+from aoc.inputs import read_text
+
 
 ACTIVE = '#'
 INACTIVE = '.'
 
 
+def read_file(fname):
+    return read_text(fname, __file__)
+
+
 def neigborhood_3d(x, y, z, include_center=True):
 
     for x_, y_, z_ in product(
@@ -105,6 +117,37 @@ def step(before, neigborhood=None):
     return after
 
 
+def run(grid, neigborhood=None, num_cycles=6):
+    for _ in range(num_cycles):
+        grid = step(grid, neigborhood=neigborhood)
+    return count_active(grid, grid.keys())
+
+
+# Actual input
+puzzle_input = """.#.##..#
+....#.##
+##.###..
+.#.#.###
+#.#.....
+.#..###.
+.#####.#
+#..####."""
+
+
+# Benchmarks (run with `python3 -m aoc.bench 17` from the repository root)
+# (the puzzle input is part of this file, `fname` is only used for generated inputs)
+@bench.register(day=17, part=1)
+def bench_part_1(fname=None):
+    grid_3d = parse_input(read_file(fname) if fname else puzzle_input)
+    return lambda: run(grid_3d)
+
+
+@bench.register(day=17, part=2)
+def bench_part_2(fname=None):
+    grid_4d = parse_input(read_file(fname) if fname else puzzle_input, dims=4)
+    return lambda: run(grid_4d, neigborhood=neigborhood_4d)
+
+
 def test():
 
     assert len(list(neigborhood_3d(0,0,0))) == 27, len(list(neigborhood_3d(0,0,0)))
@@ -134,30 +177,13 @@ def test():
 
 
 def main():
-    # Actual input
-    s = """.#.##..#
-....#.##
-##.###..
-.#.#.###
-#.#.....
-.#..###.
-.#####.#
-#..####."""
-
-
     print('Part 1')
-    grid_3d = parse_input(s)
-    for _ in range(6):
-        grid_3d = step(grid_3d)
-    num_active = count_active(grid_3d, grid_3d.keys())
-    print(num_active)
+    grid_3d = parse_input(puzzle_input)
+    print(run(grid_3d))
 
     print('Part 2')
-    grid_4d = parse_input(s, dims=4)
-    for _ in range(6):
-        grid_4d = step(grid_4d, neigborhood=neigborhood_4d)
-    num_active = count_active(grid_4d, grid_4d.keys())
-    print(num_active)
+    grid_4d = parse_input(puzzle_input, dims=4)
+    print(run(grid_4d, neigborhood=neigborhood_4d))
 
 
 if __name__ == "__main__":
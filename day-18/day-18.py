@@ -1,13 +1,18 @@
 import os
 import re
+import sys
+
+# make the shared `aoc` package importable, no matter from where this script is called
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aoc import bench
+from aoc.inputs import read_text
 
 regex_number = re.compile(r'\d')
 
 
 def read_file(fname='input.txt'):
-    fname = os.path.join(os.path.dirname(__file__), fname)
-    with open(fname, 'r') as fp:
-        return fp.read().strip().split('\n')
+    return read_text(fname, __file__).split('\n')
 
 
 def find_matching_parenthesis(expr, index_opening):
@@ -73,6 +78,13 @@ def eval(expr):
     return result
 
 
+# Benchmarks (run with `python3 -m aoc.bench 18` from the repository root)
+@bench.register(day=18, part=1)
+def bench_part_1(fname='input.txt'):
+    expressions = read_file(fname)
+    return lambda: sum(eval(expr) for expr in expressions)
+
+
 def test_find_matching_parenthesis():
     assert find_matching_parenthesis('(123)', 0) == 4
 
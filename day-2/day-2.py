@@ -5,27 +5,23 @@ Read a list of passwords including individual password policies
 and count how many passwords pass their given policy.
 """
 
+import os
 import re
-from collections import Counter
+import sys
+import tempfile
+from array import array
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
-regex = re.compile(r"(\d+)\-(\d+)\s(.):\s(.+)")
+# make the shared `aoc` package importable, no matter from where this script is called
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 
+from aoc import bench
+from aoc.days import call_day
+from aoc.inputs import byte_ranges, follow_lines, iter_lines
 
-def read_password_db(fname='input.txt'):
-    """
-    Read password db entries from file `fname` and return a list of dictionaries.
-    """
-    with open(fname) as fp:
-        matches = [regex.match(line) for line in fp.readlines()]
-            
-    passwords = [{
-        'num_1': int(m.group(1)),
-        'num_2': int(m.group(2)),
-        'character': m.group(3),
-        'password': m.group(4)
-    } for m in matches]
-    
-    return passwords
+regex = re.compile(r"(\d+)\-(\d+)\s(.):\s(.+)")
 
 
 def password_is_valid_1(password, character, num_1, num_2):
@@ -37,9 +33,8 @@ def password_is_valid_1(password, character, num_1, num_2):
 
     Returns True if policy is passed, False otherwise.
     """
-    # count how often does each character occurs
-    counter = Counter(password)
-    character_count = counter[character]  # defaults to zero if character doesn't exist at all
+    # count how often the character occurs (zero if it doesn't exist at all)
+    character_count = password.count(character)
     return num_1 <= character_count <= num_2
 
 
@@ -66,15 +61,221 @@ def password_is_valid_2(password, character, num_1, num_2):
     return (char_1 == character or char_2 == character) and char_1 != char_2
 
 
+###############################
+# Streaming validation
+###############################
+
+# A pipeline of generators: each line is parsed, validated and counted
+# before the next line is read, so memory use doesn't depend on the number
+# of passwords. Any iterable of lines works, including a growing file.
+
+def parse_entries(lines):
+    """
+    Turn lines of the password db into tuples (password, character, num_1, num_2).
+    """
+    for line in lines:
+        if line:
+            num_1, num_2, character, password = regex.match(line).groups()
+            yield password, character, int(num_1), int(num_2)
+
+
+def validate_entries(entries):
+    """
+    Check each entry against both policies, yields tuples (valid_1, valid_2).
+    """
+    for entry in entries:
+        yield password_is_valid_1(*entry), password_is_valid_2(*entry)
+
+
+def running_counts(results):
+    """
+    Yield a tuple (num_passwords, num_valid_1, num_valid_2) after each password.
+    """
+    num_passwords = num_valid_1 = num_valid_2 = 0
+    for valid_1, valid_2 in results:
+        num_passwords += 1
+        num_valid_1 += valid_1
+        num_valid_2 += valid_2
+        yield num_passwords, num_valid_1, num_valid_2
+
+
+def stream_counts(lines):
+    return running_counts(validate_entries(parse_entries(lines)))
+
+
+def count_valid_streaming(fname='input.txt'):
+    """
+    Count passwords and valid passwords per policy, one line at a time.
+    Returns the final tuple of `running_counts`.
+    """
+    last = deque(stream_counts(iter_lines(fname, __file__)), maxlen=1)
+    return last[0] if last else (0, 0, 0)
+
+
+def watch_password_db(fname, report_every=1):
+    """
+    Follow a growing password db file and print the running counts.
+    Runs until interrupted.
+    """
+    for num_passwords, num_valid_1, num_valid_2 in stream_counts(follow_lines(fname, __file__)):
+        if num_passwords % report_every == 0:
+            print(f'{num_passwords} passwords: {num_valid_1} pass policy 1, {num_valid_2} pass policy 2', flush=True)
+
+
+def test_streaming():
+    lines = ['1-3 a: abcde', '1-3 b: cdefg', '2-9 c: ccccccccc']
+    assert list(stream_counts(lines)) == [(1, 1, 1), (2, 1, 1), (3, 2, 1)]
+    assert list(stream_counts(iter([]))) == []
+
+    fd, fname = tempfile.mkstemp(suffix='.txt')
+    with os.fdopen(fd, 'w') as fp:
+        fp.write('\n'.join(lines[:2] + [''] + lines[2:]) + '\n')
+    try:
+        assert count_valid_streaming(fname) == (3, 2, 1)
+    finally:
+        os.remove(fname)
+    # the streaming and the columnar path agree on the puzzle input
+    report = check_password_db()
+    total = report.num_passwords
+    assert count_valid_streaming() == (total, total - len(report.invalid_lines_1), total - len(report.invalid_lines_2))
+
+
+###############################
+# Columnar validation
+###############################
+
+# The functions above handle one password at a time, which is fine for the
+# puzzle input. For large password dumps, we store the db as columns instead
+# (one array per field) and validate each policy in one pass over all rows.
+
+PasswordColumns = namedtuple('PasswordColumns', ['num_1', 'num_2', 'character', 'password'])
+
+PolicyReport = namedtuple('PolicyReport', ['num_passwords', 'invalid_lines_1', 'invalid_lines_2'])
+
+
+def read_password_columns(fname='input.txt', start=0, end=None):
+    """
+    Read password db entries from file `fname` as columns.
+    Only lines beginning within the byte range [start, end) are read,
+    blank lines are skipped (like in `parse_entries`).
+    """
+    columns = PasswordColumns(array('I'), array('I'), [], [])
+    for password, character, num_1, num_2 in parse_entries(iter_lines(fname, __file__, start, end)):
+        columns.num_1.append(num_1)
+        columns.num_2.append(num_2)
+        columns.character.append(character)
+        columns.password.append(password)
+    return columns
+
+
+def invalid_rows_1(columns):
+    """
+    Row indices of all passwords that fail policy 1 (see `password_is_valid_1`).
+    """
+    counts = map(str.count, columns.password, columns.character)
+    return [
+        row
+        for row, (count, num_1, num_2)
+        in enumerate(zip(counts, columns.num_1, columns.num_2))
+        if not num_1 <= count <= num_2
+    ]
+
+
+def invalid_rows_2(columns):
+    """
+    Row indices of all passwords that fail policy 2 (see `password_is_valid_2`).
+    """
+    return [
+        row
+        for row, (password, character, num_1, num_2)
+        in enumerate(zip(columns.password, columns.character, columns.num_1, columns.num_2))
+        # exactly one of both positions must contain the character
+        if (password[num_1 - 1] == character) == (password[num_2 - 1] == character)
+    ]
+
+
+def _check_range(fname, start, end):
+    columns = read_password_columns(fname, start, end)
+    return len(columns.password), invalid_rows_1(columns), invalid_rows_2(columns)
+
+
+def check_password_db(fname='input.txt', processes=1):
+    """
+    Check all passwords in file `fname` against both policies.
+
+    With `processes` > 1, the file is split into byte ranges which are
+    checked in parallel.
+
+    Returns a PolicyReport with the number of passwords and the (1-based)
+    line numbers of the passwords that fail policy 1 and policy 2. Blank lines
+    are skipped and not counted.
+    """
+    ranges = byte_ranges(fname, __file__, processes)
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            starts, ends = zip(*ranges)
+            results = list(pool.map(partial(call_day, 2, '_check_range'), [fname] * processes, starts, ends))
+    else:
+        results = [_check_range(fname, start, end) for start, end in ranges]
+
+    # row indices are relative to each range: shift them by the number of lines before that range
+    num_passwords, invalid_lines_1, invalid_lines_2 = 0, [], []
+    for num_rows, invalid_1, invalid_2 in results:
+        invalid_lines_1.extend(num_passwords + row + 1 for row in invalid_1)
+        invalid_lines_2.extend(num_passwords + row + 1 for row in invalid_2)
+        num_passwords += num_rows
+
+    return PolicyReport(num_passwords, invalid_lines_1, invalid_lines_2)
+
+
+def test_columns():
+    test_str = """1-3 a: abcde
+
+1-3 b: cdefg
+2-9 c: ccccccccc
+
+"""
+    fd, fname = tempfile.mkstemp(suffix='.txt')
+    with os.fdopen(fd, 'w') as fp:
+        fp.write(test_str)
+    try:
+        columns = read_password_columns(fname)
+        assert list(columns.num_1) == [1, 1, 2]
+        assert columns.password == ['abcde', 'cdefg', 'ccccccccc']
+        assert invalid_rows_1(columns) == [1]
+        assert invalid_rows_2(columns) == [1, 2]
+        assert check_password_db(fname) == PolicyReport(3, [2], [2, 3])
+        assert check_password_db(fname, processes=2) == check_password_db(fname)
+    finally:
+        os.remove(fname)
+
+
+# Benchmarks (run with `python3 -m aoc.bench 2` from the repository root)
+@bench.register(day=2, part=1)
+def bench_part_1(fname='input.txt'):
+    columns = read_password_columns(fname)
+    return lambda: len(columns.password) - len(invalid_rows_1(columns))
+
+
+@bench.register(day=2, part=2)
+def bench_part_2(fname='input.txt'):
+    columns = read_password_columns(fname)
+    return lambda: len(columns.password) - len(invalid_rows_2(columns))
+
+
 if __name__ == "__main__":
-    password_db = read_password_db()
+    test_streaming()
+    test_columns()
+
+    # python3 day-2.py --follow <file>: report running counts while the file grows
+    if sys.argv[1:2] == ['--follow']:
+        watch_password_db(sys.argv[2] if len(sys.argv) > 2 else 'input.txt')
+
+    report = check_password_db()
+    total = report.num_passwords
 
     print('Part 1')
-    passes = [password_is_valid_1(**kwargs) for kwargs in password_db]
-    passes = Counter(passes)
-    print(f'Out of {len(password_db)} password in total, {passes[True]} pass the password policy')
+    print(f'Out of {total} password in total, {total - len(report.invalid_lines_1)} pass the password policy')
 
     print('Part 2')
-    passes = [password_is_valid_2(**kwargs) for kwargs in password_db]
-    passes = Counter(passes)
-    print(f'Out of {len(password_db)} password in total, {passes[True]} pass the password policy')
+    print(f'Out of {total} password in total, {total - len(report.invalid_lines_2)} pass the password policy')
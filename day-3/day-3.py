@@ -1,21 +1,67 @@
 #!/usr/bin/env python3
 
+"""
+Implementation notes:
+For counting, each row of the map is packed into an integer, with bit `col`
+set if there is a tree in column `col`. `count_trees` walks the map once for
+many slopes at a time. With NumPy (and maps up to 63 columns wide), the rows
+are an int64 array, and all slopes with the same row step are evaluated
+together: a (rows x slopes) matrix of column indices picks the bits.
+
+To answer many slope queries on one map, `make_slope_query` builds an index
+per row step instead: on a slope with column step `c`, the k-th visited row
+is checked in column (k * c) % width, which only depends on k % width. So it
+suffices to count the trees per (k % width, column) once, and each query
+sums `width` of these counts.
+"""
+
 import os
-from functools import reduce
+import sys
+from collections import defaultdict, namedtuple
+from functools import lru_cache, reduce
+
+# make the shared `aoc` package importable, no matter from where this script is called
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aoc import bench
+from aoc.inputs import iter_lines
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 TREE = '#'
 OPEN = '.'
 
+# a map with one integer per row, bit `col` is set if there is a tree in column `col`
+TreeMap = namedtuple('TreeMap', ['rows', 'width'])
+
+_to_bits = str.maketrans({TREE: '1', OPEN: '0'})
+
 
 def read_tree_map(fname='input.txt'):
-    # always find file, no matter from where this script is called
-    fname = os.path.join(
-        os.path.dirname(__file__),
-        fname
-    )
+    return list(iter_lines(fname, __file__))
+
+
+def pack_tree_map(lines):
+    """
+    Pack the lines of a map (any iterable, e.g. `iter_lines`) into a `TreeMap`.
+    """
+    rows = []
+    width = 0
+    for line in lines:
+        if line:
+            width = len(line)
+            # reversed, so that the first column ends up in the lowest bit
+            rows.append(int(line[::-1].translate(_to_bits), 2))
+    if np is not None and width < 64:
+        rows = np.array(rows, dtype=np.int64)
+    return TreeMap(rows, width)
 
-    with open(fname) as fp:
-        return [line.replace('\n', '') for line in fp.readlines()]
+
+def read_packed_tree_map(fname='input.txt'):
+    return pack_tree_map(iter_lines(fname, __file__))
 
 
 def coordinates(start_row, start_col, step_row, step_col, last_row):
@@ -49,33 +95,200 @@ def traverse(tree_map, step_row, step_col):
     return count_trees
 
 
+def _group_by_step_row(steps):
+    groups = defaultdict(list)
+    for i, (step_row, _) in enumerate(steps):
+        groups[step_row].append(i)
+    return sorted(groups.items())
+
+
+def _count_trees_python(tree_map, steps):
+    rows, width = tree_map
+    groups = _group_by_step_row(steps)
+    step_cols = [step_col % width for _, step_col in steps]
+    cols = [0] * len(steps)
+    counts = [0] * len(steps)
+
+    # one pass over the rows (skipping (0,0)), advancing every slope that visits the row
+    for row_index in range(1, len(rows)):
+        row = int(rows[row_index])
+        for step_row, indices in groups:
+            if row_index % step_row:
+                continue
+            for i in indices:
+                col = cols[i] + step_cols[i]
+                if col >= width:
+                    col -= width
+                cols[i] = col
+                counts[i] += row >> col & 1
+
+    return counts
+
+
+def _count_trees_numpy(tree_map, steps, max_cells=1 << 20):
+    rows, width = tree_map
+    counts = [0] * len(steps)
+
+    for step_row, indices in _group_by_step_row(steps):
+        step_cols = np.array([steps[i][1] % width for i in indices], dtype=np.int64)
+        visited = rows[step_row::step_row]
+        totals = np.zeros(len(indices), dtype=np.int64)
+
+        # chunks of at most `max_cells` (row, slope) cells
+        rows_per_chunk = max(1, max_cells // len(indices))
+        for start in range(0, len(visited), rows_per_chunk):
+            chunk = visited[start:start + rows_per_chunk]
+            num_steps = np.arange(start + 1, start + 1 + len(chunk), dtype=np.int64)
+            cols = num_steps[:, None] * step_cols[None, :] % width
+            totals += (chunk[:, None] >> cols & 1).sum(axis=0)
+
+        for i, total in zip(indices, totals):
+            counts[i] = int(total)
+
+    return counts
+
+
+def count_trees(tree_map, steps):
+    """
+    Count the trees encountered on each slope (step_row, step_col) in `steps`,
+    on a packed `TreeMap`. Returns a list with one count per slope.
+    """
+    if not steps or not tree_map.width:
+        return [0] * len(steps)
+    if any(step_row < 1 for step_row, _ in steps):
+        raise ValueError('step_row must be at least 1')
+    if np is not None and isinstance(tree_map.rows, np.ndarray):
+        return _count_trees_numpy(tree_map, steps)
+    return _count_trees_python(tree_map, steps)
+
+
+def _residue_counts(tree_map, step_row):
+    """
+    Count the trees of the rows k * step_row (k >= 1) per column, separately
+    for each residue k % width. Returns a list with one list of counts per residue.
+    """
+    rows, width = tree_map
+    visited = rows[step_row::step_row]
+    residues = []
+    for residue in range(width):
+        # visited[i] is the row for k = i + 1
+        residue_rows = visited[(residue - 1) % width::width]
+        if np is not None and isinstance(residue_rows, np.ndarray):
+            columns = np.arange(width, dtype=np.int64)
+            counts = (residue_rows[:, None] >> columns & 1).sum(axis=0).tolist()
+        else:
+            counts = [0] * width
+            for row in residue_rows:
+                row = int(row)
+                # visit the set bits only
+                while row:
+                    lowest = row & -row
+                    counts[lowest.bit_length() - 1] += 1
+                    row ^= lowest
+        residues.append(counts)
+    return residues
+
+
+def make_slope_query(tree_map, maxsize=1024, max_row_steps=16):
+    """
+    Build a function `query(step_row, step_col)` that counts the trees on a
+    slope of the packed `TreeMap`.
+
+    The index for a row step is built on its first query and costs one pass
+    over the map, after that each new column step takes O(width). Answers
+    are kept for the `maxsize` most recently queried slopes, and indexes for
+    the `max_row_steps` most recently used row steps (`query.cache_info()`
+    reports the hits).
+    """
+    width = tree_map.width
+
+    @lru_cache(maxsize=max_row_steps)
+    def index(step_row):
+        return _residue_counts(tree_map, step_row)
+
+    @lru_cache(maxsize=maxsize)
+    def query(step_row, step_col):
+        if step_row < 1:
+            raise ValueError('step_row must be at least 1')
+        if not width:
+            return 0
+        residues = index(step_row)
+        step_col %= width
+        return sum(counts[residue * step_col % width] for residue, counts in enumerate(residues))
+
+    return query
+
+
+def multiply_trees(tree_map, steps):
+    """
+    Multiply the number of trees encountered on each slope, on a packed `TreeMap`.
+    """
+    return reduce(lambda a, b: a * b, count_trees(tree_map, steps))
+
+
+# slopes to check for part 2, as (step_row, step_col)
+steps_part_2 = [
+    (1, 1),
+    (1, 3),
+    (1, 5),
+    (1, 7),
+    (2, 1)
+]
+
+
+def test_count_trees():
+    lines = [
+        '..##.......',
+        '#...#...#..',
+        '.#....#..#.',
+        '..#.#...#.#',
+        '.#...##..#.',
+        '..#.##.....',
+        '.#.#.#....#',
+        '.#........#',
+        '#.##...#...',
+        '#...##....#',
+        '.#..#...#.#',
+    ]
+    steps = steps_part_2 + [(3, 2), (1, 11), (1, 25), (4, 0), (12, 1)]
+    expected = [traverse(lines, step_row, step_col) for step_row, step_col in steps]
+    assert expected[:5] == [2, 7, 3, 4, 2]
+
+    tree_map = pack_tree_map(lines)
+    assert count_trees(tree_map, steps) == expected
+    assert _count_trees_python(TreeMap(list(map(int, tree_map.rows)), tree_map.width), steps) == expected
+    assert multiply_trees(tree_map, steps_part_2) == 336
+    assert count_trees(pack_tree_map([]), steps_part_2) == [0] * 5
+
+    query = make_slope_query(tree_map)
+    assert [query(step_row, step_col) for step_row, step_col in steps] == expected
+    assert query(1, 3) == 7 and query.cache_info().hits == 1
+    assert query(1, 3 + 11) == 7
+    assert make_slope_query(pack_tree_map([]))(1, 3) == 0
+
+
+# Benchmarks (run with `python3 -m aoc.bench 3` from the repository root)
+@bench.register(day=3, part=1)
+def bench_part_1(fname='input.txt'):
+    tree_map = read_packed_tree_map(fname)
+    return lambda: count_trees(tree_map, [(1, 3)])[0]
+
+
+@bench.register(day=3, part=2)
+def bench_part_2(fname='input.txt'):
+    tree_map = read_packed_tree_map(fname)
+    return lambda: multiply_trees(tree_map, steps_part_2)
+
+
 if __name__ == "__main__":
-    tree_map = read_tree_map()
+    test_count_trees()
+
+    tree_map = read_packed_tree_map()
 
     print("Part 1")
-    result = traverse(
-        tree_map,
-        step_row=1,
-        step_col=3
-    )
+    result = count_trees(tree_map, [(1, 3)])[0]
     print(f"Answer: Encountered {result} trees")
 
     print("Part 2")
-    steps = [
-        (1, 1),
-        (1, 3),
-        (1, 5),
-        (1, 7),
-        (2, 1) 
-    ]
-    num_trees = [
-        traverse(
-            tree_map,
-            step_row=step_row,
-            step_col=step_col
-        ) 
-        for step_row, step_col
-        in steps
-    ]
-    product = reduce(lambda a, b: a * b, num_trees)
+    product = multiply_trees(tree_map, steps_part_2)
     print(f"Answer: The product of all trees encountered is {product}")
@@ -23,15 +23,35 @@ Implementation notes:
   - Useing `functools.partial` to bind parameter values to a wrapped function
   - Using Python `assert` statements for test cases, in order to check that
     the validation rules are implemented correctly
+  - `compile_validator` turns the rules into a single function, which checks
+    the required fields and the rules in one pass over a passport string,
+    without building a dictionary for each passport
+  - `check_passport_db` splits large files into byte ranges on record
+    boundaries and checks them in parallel
+  - The rules can also be written as a schema of plain data (see
+    `passport_schema`), which `compile_schema` turns into validators.
+    Where possible, a validator is a builtin method (like `frozenset.__contains__`
+    or a compiled regex's `fullmatch`), so it costs no Python function call
 """
 
+import json
 import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from functools import partial
 
+# make the shared `aoc` package importable, no matter from where this script is called
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aoc import bench
+from aoc.days import call_day
+from aoc.inputs import byte_ranges, iter_records, read_text
+
 regex_year = re.compile(r'^\d{4}$')
-regex_height = re.compile(r'(\d+)(in|cm)')
+regex_height = re.compile(r'^(\d+)(in|cm)$')
 regex_color = re.compile(r'^\#(\d|[abcdef]){6}$')
+regex_pid = re.compile(r'^\d{9}$')
 
 required_fields = [
     'byr',  # Birth Year
@@ -65,21 +85,14 @@ def read_passport_db(fname='input.txt'):
     Returns a list of dictionaries where each dictionary represents a single passport.
     """
 
-    # always find file, no matter from where this script is called
-    fname = os.path.join(
-        os.path.dirname(__file__),
-        fname
+    passports = (
+        passport
+        .replace('\n', ' ')  # remove any line breaks
+        .strip()  # remove all leading/trailing whitespace
+        for passport
+        in iter_records(fname, __file__)  # blank line separates entries
     )
 
-    with open(fname) as fp:
-        passports = [
-            passport
-            .replace('\n', ' ')  # remove any line breaks 
-            .strip()  # remove all leading/trailing whitespace
-            for passport
-            in fp.read().split('\n\n')  # blank line separates entries
-        ]
-
     return [parse_passport_str(passport) for passport in passports]
 
 ###############################
@@ -149,7 +162,6 @@ def validate_pid(v):
     Validate field pid (Passport ID) 
     A nine-digit number, including leading zeroes.
     """
-    regex_pid = re.compile(r'^\d{9}$')
     return regex_pid.match(v)
 
 
@@ -168,6 +180,178 @@ def get_validation_rules():
     }
 
 
+###############################
+# Validation schema
+###############################
+
+# The rules of `get_validation_rules`, as a schema. Each field has exactly one check:
+#   {'range': [min, max], 'digits': n}  a number (of exactly n digits, if given) within [min, max]
+#   {'units': {unit: [min, max]}}        a number followed by a unit, with a range per unit
+#   {'enum': [values]}                   one of the values
+#   {'regex': pattern}                   the whole value matches the pattern
+passport_schema = {
+    'byr': {'range': [1920, 2002], 'digits': 4},
+    'iyr': {'range': [2010, 2020], 'digits': 4},
+    'eyr': {'range': [2020, 2030], 'digits': 4},
+    'hgt': {'units': {'cm': [150, 193], 'in': [59, 76]}},
+    'hcl': {'regex': '#[0-9a-f]{6}'},
+    'ecl': {'enum': ['amb', 'blu', 'brn', 'gry', 'grn', 'hzl', 'oth']},
+    'pid': {'regex': '[0-9]{9}'},
+}
+
+
+def _compile_range(min_value, max_value, digits=None):
+    def validate(v):
+        return v.isdigit() and v.isascii() and min_value <= int(v) <= max_value
+
+    def validate_digits(v):
+        return len(v) == digits and v.isdigit() and v.isascii() and min_value <= int(v) <= max_value
+
+    return validate if digits is None else validate_digits
+
+
+def _compile_units(units):
+    # unit -> (length of unit, min, max)
+    bounds = {unit: (len(unit), min_value, max_value) for unit, (min_value, max_value) in units.items()}
+    regex_unit = re.compile('({})$'.format('|'.join(re.escape(unit) for unit in units)))
+
+    def validate(v):
+        m = regex_unit.search(v)
+        if not m:
+            return False
+        length, min_value, max_value = bounds[m.group()]
+        number = v[:-length]
+        return number.isdigit() and number.isascii() and min_value <= int(number) <= max_value
+
+    return validate
+
+
+def compile_rule(spec):
+    """
+    Compile the schema of a single field into a function that validates a value.
+    """
+    if len(spec) == 1 and 'enum' in spec:
+        return frozenset(spec['enum']).__contains__
+    if len(spec) == 1 and 'regex' in spec:
+        return re.compile(spec['regex']).fullmatch
+    if len(spec) == 1 and 'units' in spec:
+        return _compile_units(spec['units'])
+    if 'range' in spec and set(spec) <= {'range', 'digits'}:
+        return _compile_range(*spec['range'], digits=spec.get('digits'))
+    raise ValueError(f'invalid field schema: {spec!r}')
+
+
+def compile_schema(schema):
+    """
+    Compile a schema {field: spec} into rules {field: validate function},
+    which can be used like the rules of `get_validation_rules`.
+    """
+    return {field: compile_rule(spec) for field, spec in schema.items()}
+
+
+def load_schema(fname):
+    """
+    Load a schema from a JSON file, in the format of `passport_schema`.
+    """
+    return json.loads(read_text(fname, __file__))
+
+
+###############################
+# Single pass validation
+###############################
+
+def compile_validator(rules, required_fields=required_fields):
+    """
+    Compile the rules into a function `check(passport_str)`, which returns a
+    tuple (has all required fields, has all required fields and all rules validate).
+
+    Each field is looked up once in a table that holds its bit in a mask of
+    the required fields and its rule. So a passport is checked while its
+    pairs are read, without building a dictionary first.
+    """
+    bits = {field: 1 << i for i, field in enumerate(required_fields)}
+    all_required = (1 << len(required_fields)) - 1
+    table = {
+        field: (bits.get(field, 0), rules.get(field))
+        for field in set(bits) | set(rules)
+    }
+
+    def check(passport_str):
+        seen = 0
+        valid = True
+        for pair in passport_str.split():
+            field, _, value = pair.partition(':')
+            entry = table.get(field)
+            if entry is None:
+                continue
+            bit, rule = entry
+            seen |= bit
+            if valid and rule is not None and not rule(value):
+                valid = False
+        has_required = seen == all_required
+        return has_required, has_required and valid
+
+    return check
+
+
+def count_valid_passports(passport_strs, check):
+    """
+    Check passport strings (e.g. the records of `iter_records`) with a compiled validator.
+    Returns a tuple (number of passports, number with all required fields, number that validate).
+    """
+    num_passports = num_required = num_valid = 0
+    for passport_str in passport_strs:
+        has_required, valid = check(passport_str)
+        num_passports += 1
+        num_required += has_required
+        num_valid += valid
+    return num_passports, num_required, num_valid
+
+
+def _check_range(fname, start, end):
+    check = compile_validator(compile_schema(passport_schema))
+    return count_valid_passports(iter_records(fname, __file__, start, end), check)
+
+
+def check_passport_db(fname='input.txt', processes=1):
+    """
+    Check all passports in file `fname`.
+
+    With `processes` > 1, the file is split into byte ranges which are
+    checked in parallel (a passport belongs to the range its first line begins in).
+
+    Returns a tuple (number of passports, number with all required fields, number that validate).
+    """
+    ranges = byte_ranges(fname, __file__, processes)
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            starts, ends = zip(*ranges)
+            results = list(pool.map(partial(call_day, 4, '_check_range'), [fname] * processes, starts, ends))
+    else:
+        results = [_check_range(fname, start, end) for start, end in ranges]
+
+    return tuple(sum(counts) for counts in zip(*results))
+
+
+##############
+# Benchmarks
+##############
+
+# run with `python3 -m aoc.bench 4` from the repository root
+@bench.register(day=4, part=1)
+def bench_part_1(fname='input.txt'):
+    passport_strs = list(iter_records(fname, __file__))
+    check = compile_validator({})
+    return lambda: count_valid_passports(passport_strs, check)[1]
+
+
+@bench.register(day=4, part=2)
+def bench_part_2(fname='input.txt'):
+    passport_strs = list(iter_records(fname, __file__))
+    check = compile_validator(compile_schema(passport_schema))
+    return lambda: count_valid_passports(passport_strs, check)[2]
+
+
 ##############
 # Test cases
 ##############
@@ -212,6 +396,63 @@ def test_validate_pid():
     assert not validate_pid('0123456789')
 
 
+def test_compile_validator():
+    check = compile_validator(get_validation_rules())
+    assert check('eyr:2029 ecl:blu cid:129 byr:1989\niyr:2014 pid:896056539 hcl:#a97842 hgt:165cm') == (True, True)
+    assert check('eyr:2029 ecl:blu byr:1989\niyr:2014 pid:896056539 hcl:#a97842 hgt:165cm') == (True, True)
+    assert check('eyr:1972 cid:100\nhcl:#18171d ecl:amb hgt:170 pid:186cm iyr:2018 byr:1926') == (True, False)
+    assert check('hcl:#cfa07d eyr:2025 pid:166559648\niyr:2011 ecl:brn hgt:59in') == (False, False)
+    assert check('') == (False, False)
+
+    passport_strs = list(iter_records('input.txt', __file__))
+    passports = [parse_passport_str(p.replace('\n', ' ')) for p in passport_strs]
+    rules = get_validation_rules()
+    assert [check(p)[0] for p in passport_strs] \
+        == [validate_required_fields(p, required_fields) for p in passports]
+    assert [check(p)[1] for p in passport_strs] \
+        == [validate_required_fields(p, required_fields) and bool(validate_rules(p, rules)) for p in passports]
+
+
+def test_compile_schema():
+    rules = compile_schema(passport_schema)
+    values = [
+        '', '2002', '2003', '1920', '1919', '02002', '200', '2020', '2030', '2010',
+        '60in', '190cm', '190in', '190', '59in', '76in', '77in', '149cm', 'cm', '+60in', '6 0in',
+        '60in0', '170cmx', '60inin', 'x170cm',
+        '#123abc', '#123abz', '123abc', '#123abcd', '#ABCDEF',
+        'brn', 'wat', 'amb ', '000000001', '0123456789', '12345678a',
+    ]
+    reference = get_validation_rules()
+    for field, rule in rules.items():
+        for v in values:
+            assert bool(rule(v)) == bool(reference[field](v)), (field, v)
+    # unlike `\d` in the regular expressions, numbers in the schema are ASCII digits only
+    assert not rules['pid']('１２３４５６７８９') and not rules['byr']('２０００')
+
+    # schemas survive a round trip through JSON
+    assert compile_schema(json.loads(json.dumps(passport_schema))).keys() == rules.keys()
+
+    assert compile_rule({'range': [1, 10]})('10')
+    assert not compile_rule({'range': [1, 10]})('11')
+    assert compile_rule({'units': {'kg': [1, 2], 'g': [1000, 2000]}})('1500g')
+    assert not compile_rule({'units': {'kg': [1, 2], 'g': [1000, 2000]}})('1500kg')
+    for invalid in ({}, {'enum': ['a'], 'regex': 'a'}, {'digits': 4}, {'range': [1, 2], 'enum': ['a']}):
+        try:
+            compile_rule(invalid)
+            assert False, invalid
+        except ValueError:
+            pass
+
+
+def test_check_passport_db():
+    counts = check_passport_db()
+    assert counts == count_valid_passports(iter_records('input.txt', __file__), compile_validator(get_validation_rules()))
+    # splitting never loses or duplicates a passport, wherever the ranges end
+    for num_ranges in (2, 3, 7, 50):
+        ranges = byte_ranges('input.txt', __file__, num_ranges)
+        assert tuple(sum(c) for c in zip(*(_check_range('input.txt', *r) for r in ranges))) == counts
+
+
 def test_all():
     "Runs all test cases"
     test_validate_year()
@@ -219,28 +460,19 @@ def test_all():
     test_validate_hair_color()
     test_validate_eye_color()
     test_validate_pid()
+    test_compile_validator()
+    test_compile_schema()
+    test_check_passport_db()
 
 
 if __name__ == "__main__":
     # Run unit tests
     test_all()
 
-    # Read list of passports
-    passports = read_passport_db()
-    
     # Part 1: Check that all required fields are present
-    passports_with_required_fields = [
-        passport for passport in passports if validate_required_fields(passport, required_fields=required_fields)
-    ]
-
     # Part 2: Check that all required fields pass the validation rules
-    valid_passports = [
-        passport 
-        for passport 
-        in passports_with_required_fields 
-        if validate_rules(passport, rules=get_validation_rules())
-    ]
+    num_passports, num_required, num_valid = check_passport_db()
 
-    print(f'Total number passports: {len(passports)}')
-    print(f'Number of passports with all required fields: {len(passports_with_required_fields)}')
-    print(f'Number of passports where all fields validate: {len(valid_passports)}')
+    print(f'Total number passports: {num_passports}')
+    print(f'Number of passports with all required fields: {num_required}')
+    print(f'Number of passports where all fields validate: {num_valid}')
@@ -1,6 +1,34 @@
 #!/usr/bin/env python3
 
+"""
+Implementation notes:
+A boarding pass is the seat id in binary, with B/R for 1 and F/L for 0.
+`decode_boarding_passes` decodes a whole file at once: with NumPy, the bytes
+are viewed as a matrix with one row per pass, and a dot product with the
+powers of two gives all seat ids. Without NumPy, a `bytes.translate` table
+turns the passes into binary numbers for `int(..., 2)`.
+
+Seats are tracked in an occupancy array with one counter per seat of the
+plane (passes can be added and removed while boarding goes on). Finding
+the largest id or the free seats then takes a single pass over the plane's
+1024 seats, no matter how many passes there are.
+"""
+
 import os
+import sys
+from array import array
+from functools import partial
+
+# make the shared `aoc` package importable, no matter from where this script is called
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aoc import bench
+from aoc.inputs import input_path, iter_lines
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 def binary_str_to_int(value, high='1', low='0'):
@@ -28,31 +56,193 @@ def read_boarding_plan(fname='input.txt'):
     Each integer is a seat id on the plane.
     """
 
-    # always find file, no matter from where this script is called
-    fname = os.path.join(
-        os.path.dirname(__file__),
-        fname
-    )
+    return [
+        parse_boarding_pass(boarding_pass)
+        for boarding_pass
+        in iter_lines(fname, __file__)
+    ]
+
+
+_to_binary = bytes.maketrans(b'BFRL', b'1010')
+
+PASS_LENGTH = 10
+NUM_SEATS = 1 << PASS_LENGTH  # 128 rows of 8 seats
+
+
+def _decode_numpy(data):
+    """
+    Decode passes of exactly `PASS_LENGTH` characters, each followed by a line break.
+    Returns None if the data doesn't have this layout.
+    """
+    if len(data) % (PASS_LENGTH + 1):
+        return None
+    passes = np.frombuffer(data, dtype=np.uint8).reshape(-1, PASS_LENGTH + 1)
+    if not (passes[:, PASS_LENGTH] == ord('\n')).all():
+        return None
+    passes = passes[:, :PASS_LENGTH]
+    ones = (passes == ord('B')) | (passes == ord('R'))
+    if not (ones | (passes == ord('F')) | (passes == ord('L'))).all():
+        return None
+    powers = 1 << np.arange(PASS_LENGTH - 1, -1, -1, dtype=np.uint16)
+    return ones.astype(np.uint16) @ powers
+
+
+def decode_boarding_passes(data):
+    """
+    Decode the boarding passes in `data` (bytes, one pass per line).
+    Returns the seat ids as an `array('H')`.
+    """
+    seat_ids = array('H')
+    if np is not None:
+        decoded = _decode_numpy(data.rstrip() + b'\n')
+        if decoded is not None:
+            seat_ids.frombytes(decoded.astype(np.uint16).tobytes())
+            return seat_ids
+    seat_ids.extend(map(partial(int, base=2), data.translate(_to_binary).split()))
+    return seat_ids
+
+
+def read_seat_ids(fname='input.txt'):
+    """
+    Read the boarding plan and decode all passes at once.
+    Returns an `array('H')` of seat ids.
+    """
+    with open(input_path(fname, __file__), 'rb') as fp:
+        return decode_boarding_passes(fp.read())
+
+
+def test_decode_boarding_passes():
+    passes = ['BFFFBBFRRR', 'FFFBBBFRRR', 'BBFFBBFRLL']
+    expected = [parse_boarding_pass(p) for p in passes]
+    assert list(decode_boarding_passes('\n'.join(passes).encode())) == expected
+    assert list(decode_boarding_passes(('\r\n'.join(passes) + '\r\n').encode())) == expected
+    assert list(decode_boarding_passes(b'')) == []
+    assert list(read_seat_ids()) == read_boarding_plan()
+
+
+###############################
+# Seat occupancy
+###############################
+
+def seat_occupancy(seat_ids=()):
+    """
+    Count the passes per seat. Returns an `array('Q')` with one counter per seat of the plane.
+    """
+    if np is not None and isinstance(seat_ids, array) and seat_ids.typecode == 'H':
+        counts = np.bincount(np.frombuffer(seat_ids, dtype=np.uint16), minlength=NUM_SEATS)
+        return array('Q', counts.astype(np.uint64).tobytes())
+
+    occupancy = array('Q', bytes(8 * NUM_SEATS))
+    for seat_id in seat_ids:
+        occupancy[seat_id] += 1
+    return occupancy
+
+
+def add_pass(occupancy, seat_id):
+    occupancy[seat_id] += 1
+
+
+def remove_pass(occupancy, seat_id):
+    if not occupancy[seat_id]:
+        raise ValueError(f'seat {seat_id} is not taken')
+    occupancy[seat_id] -= 1
+
+
+def max_seat_id(occupancy):
+    """
+    The largest id of a taken seat, or None if all seats are free.
+    """
+    for seat_id in range(len(occupancy) - 1, -1, -1):
+        if occupancy[seat_id]:
+            return seat_id
+    return None
+
+
+def all_free_seats(occupancy):
+    return [seat_id for seat_id, count in enumerate(occupancy) if not count]
+
+
+def free_seats_between_taken(occupancy):
+    """
+    Find all seats that are free, but whose neighbours (id +1 and -1) are taken.
+    """
+    return [
+        seat_id
+        for seat_id in range(1, len(occupancy) - 1)
+        if not occupancy[seat_id] and occupancy[seat_id - 1] and occupancy[seat_id + 1]
+    ]
+
+
+def find_free_seats(seat_ids):
+    """
+    Find all seats that are free, but whose neighbours (id +1 and -1) are taken.
+    """
+    return free_seats_between_taken(seat_occupancy(seat_ids))
+
+
+def find_my_seat(seat_ids):
+    """
+    Find the one free seat whose neighbours are taken. Raises ValueError if there isn't exactly one.
+    """
+    seats = find_free_seats(seat_ids)
+    if len(seats) != 1:
+        raise ValueError(f'expected exactly one free seat between taken seats, found {len(seats)}')
+    return seats[0]
+
+
+def test_seat_occupancy():
+    occupancy = seat_occupancy([3, 5, 5, 8])
+    assert max_seat_id(occupancy) == 8
+    assert free_seats_between_taken(occupancy) == [4]
+    assert find_my_seat([3, 5, 5, 8]) == 4
+    try:
+        find_my_seat([3, 5, 7])
+        assert False, 'two free seats must be rejected'
+    except ValueError:
+        pass
+    assert all_free_seats(occupancy)[:6] == [0, 1, 2, 4, 6, 7]
+
+    add_pass(occupancy, 7)
+    add_pass(occupancy, 1023)
+    assert max_seat_id(occupancy) == 1023
+    assert free_seats_between_taken(occupancy) == [4, 6]
+
+    remove_pass(occupancy, 5)
+    assert free_seats_between_taken(occupancy) == [4, 6]
+    remove_pass(occupancy, 5)
+    assert free_seats_between_taken(occupancy) == []
+    remove_pass(occupancy, 1023)
+    assert max_seat_id(occupancy) == 8
+    try:
+        remove_pass(occupancy, 5)
+        assert False
+    except ValueError:
+        pass
+    assert max_seat_id(seat_occupancy()) is None
+
+    seat_ids = read_seat_ids()
+    assert seat_occupancy(seat_ids) == seat_occupancy(list(seat_ids))
+
+
+# Benchmarks (run with `python3 -m aoc.bench 5` from the repository root)
+@bench.register(day=5, part=1)
+def bench_part_1(fname='input.txt'):
+    return lambda: max_seat_id(seat_occupancy(read_seat_ids(fname)))
 
-    with open(fname) as fp:
-        boarding_passes = [
-            parse_boarding_pass(boarding_pass)
-            for boarding_pass
-            in fp.readlines()
-        ]
 
-    return boarding_passes
+@bench.register(day=5, part=2)
+def bench_part_2(fname='input.txt'):
+    return lambda: find_my_seat(read_seat_ids(fname))
 
 
 if __name__ == "__main__":
     test_parse_boarding_pass()
-    seat_ids = read_boarding_plan()
+    test_decode_boarding_passes()
+    test_seat_occupancy()
+    occupancy = seat_occupancy(read_seat_ids())
     print('Part 1')
-    print(f'Largest seat id: {max(seat_ids)}')
+    print(f'Largest seat id: {max_seat_id(occupancy)}')
 
     print('Part 2')
-    seat_ids = sorted(seat_ids)
-    for seat_a, seat_b in zip(seat_ids[:-1], seat_ids[1:]):
-        if seat_b - seat_a == 2:
-            print(f'Free seat: {seat_b - 1}')
-    
\ No newline at end of file
+    for seat in free_seats_between_taken(occupancy):
+        print(f'Free seat: {seat}')
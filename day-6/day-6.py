@@ -1,36 +1,154 @@
 #!/usr/bin/env python3
 
+"""
+Implementation notes:
+The answers of a person are a 26 bit mask, one bit per question a-z. The
+answers of a group are then combined with bitwise OR (anyone answered "yes")
+or AND (everyone answered "yes"), and the bits of the result are counted.
+
+`count_group_answers` reads the file line by line and keeps only the masks
+of the current group. With NumPy, it computes all masks at once instead:
+`reduceat` ORs the bits of the letters of each line, then ORs (or ANDs)
+the lines of each group.
+"""
+
 import os
-from functools import partial
+import sys
+from functools import lru_cache, partial, reduce
+from operator import and_, or_
+from string import ascii_lowercase
+
+# make the shared `aoc` package importable, no matter from where this script is called
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aoc import bench
+from aoc.inputs import input_path, iter_lines, iter_records
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+letter_bits = {letter: 1 << i for i, letter in enumerate(ascii_lowercase)}
 
 
 def read_group_answers(fname='input.txt'):
-    # always find file, no matter from where this script is called
-    fname = os.path.join(
-        os.path.dirname(__file__),
-        fname
+    # blank line separates groups
+    return list(iter_records(fname, __file__))
+
+
+def person_mask(answers):
+    mask = 0
+    for answer in answers:
+        mask |= letter_bits[answer]
+    return mask
+
+
+def count_bits(mask):
+    return bin(mask).count('1')
+
+
+def count_answers(groups, combine):
+    return sum(
+        count_bits(reduce(combine, map(person_mask, group.split('\n'))))
+        for group in groups
     )
 
-    with open(fname) as fp:
-        groups = [
-            group.strip()  # remove leftover whitespace surrounding groups
-            for group 
-            in fp.read().split('\n\n')  # blank line separates groups
-        ]
-    return groups
+
+count_unique_answers = partial(count_answers, combine=or_)
+count_shared_answers = partial(count_answers, combine=and_)
+
+
+def iter_group_masks(lines):
+    """
+    Yield a tuple (OR, AND) of the answer masks of each group, from the lines of the file.
+    """
+    union, intersection, in_group = 0, 0, False
+    for line in lines:
+        if line.strip():
+            mask = person_mask(line)
+            if in_group:
+                union |= mask
+                intersection &= mask
+            else:
+                union, intersection, in_group = mask, mask, True
+        elif in_group:
+            yield union, intersection
+            in_group = False
+    if in_group:
+        yield union, intersection
 
 
-def count_answers(groups, set_fn):
-    group_counts = []
-    for group in groups:
-        answers = [set(answers) for answers in group.split('\n')]
-        answers = set_fn(*answers)
-        group_counts.append(len(answers))
-    return sum(group_counts)
+@lru_cache(maxsize=None)
+def _popcount_table():
+    # number of bits of every 16 bit value, built once on first use
+    values = np.arange(1 << 16, dtype=np.uint32)
+    return sum((values >> bit) & 1 for bit in range(16)).astype(np.uint8)
 
 
-count_unique_answers = partial(count_answers, set_fn=set.union)
-count_shared_answers = partial(count_answers, set_fn=set.intersection)
+def _popcount_numpy(masks):
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(masks)
+    # NumPy < 2.0: count the bits of each 16 bit half in a table
+    table = _popcount_table()
+    return table[masks & 0xffff] + table[masks >> 16]
+
+
+def _group_masks_numpy(data):
+    """
+    Compute the (OR, AND) answer masks of all groups in `data` (bytes, '\\n' line breaks).
+    Returns two arrays, with one entry per group.
+    """
+    if not data.endswith(b'\n'):
+        data += b'\n'
+    chars = np.frombuffer(data, dtype=np.uint8)
+    is_letter = (chars >= ord('a')) & (chars <= ord('z'))
+    shifts = np.where(is_letter, chars - ord('a'), 0).astype(np.uint32)
+    bits = np.left_shift(np.uint32(1), shifts) * is_letter
+
+    # a line spans from its first character to its line break (which has no bits)
+    line_ends = np.flatnonzero(chars == ord('\n'))
+    line_starts = np.concatenate(([0], line_ends[:-1] + 1))
+    line_masks = np.bitwise_or.reduceat(bits, line_starts)
+
+    # lines without answers separate the groups
+    is_person = line_masks != 0
+    group_ids = np.cumsum(~is_person)[is_person]
+    person_masks = line_masks[is_person]
+    if not len(person_masks):
+        return person_masks, person_masks
+    group_starts = np.flatnonzero(np.diff(group_ids, prepend=-1))
+    return np.bitwise_or.reduceat(person_masks, group_starts), np.bitwise_and.reduceat(person_masks, group_starts)
+
+
+def count_group_answers(fname='input.txt'):
+    """
+    Count the answers given by anyone and by everyone in a group, summed over all groups.
+    Returns a tuple (unique answers, shared answers).
+    """
+    if np is not None:
+        with open(input_path(fname, __file__), 'rb') as fp:
+            data = fp.read()
+        if b'\r' not in data:
+            unions, intersections = _group_masks_numpy(data)
+            return int(_popcount_numpy(unions).sum()), int(_popcount_numpy(intersections).sum())
+
+    unique_answers = shared_answers = 0
+    for union, intersection in iter_group_masks(iter_lines(fname, __file__)):
+        unique_answers += count_bits(union)
+        shared_answers += count_bits(intersection)
+    return unique_answers, shared_answers
+
+
+# Benchmarks (run with `python3 -m aoc.bench 6` from the repository root)
+@bench.register(day=6, part=1)
+def bench_part_1(fname='input.txt'):
+    return lambda: count_group_answers(fname)[0]
+
+
+@bench.register(day=6, part=2)
+def bench_part_2(fname='input.txt'):
+    return lambda: count_group_answers(fname)[1]
 
 
 def test_count():
@@ -38,15 +156,32 @@ def test_count():
     assert count_shared_answers(groups) == 3 + 0 + 1 + 1 + 1
     assert count_unique_answers(groups) == 3 + 3 + 3 + 1 + 1
 
+    lines = '\n\n'.join(groups).split('\n')
+    masks = list(iter_group_masks(lines))
+    assert sum(count_bits(union) for union, _ in masks) == count_unique_answers(groups)
+    assert sum(count_bits(intersection) for _, intersection in masks) == count_shared_answers(groups)
+
+    if np is not None:
+        unions, intersections = _group_masks_numpy(('\n\n\n'.join(groups) + '\n').encode())
+        assert [tuple(map(int, m)) for m in zip(unions, intersections)] == masks
+        assert [len(m) for m in _group_masks_numpy(b'\n\n')] == [0, 0]
+        # the table used without np.bitwise_count
+        table = _popcount_table()
+        assert table is _popcount_table()
+        assert list(table[[0, 1, 6, 0xffff]]) == [0, 1, 2, 16]
+        assert [int(table[m & 0xffff] + table[m >> 16]) for m in unions] == [count_bits(int(m)) for m in unions]
+
+    groups = read_group_answers()
+    assert count_group_answers() == (count_unique_answers(groups), count_shared_answers(groups))
+
+
 if __name__ == "__main__":
     test_count()
 
-    group_answers = read_group_answers()
+    unique_answers, shared_answers = count_group_answers()
 
     print('Part 1')
-    unique_answers = count_unique_answers(group_answers)
     print(f'In total, the groups gave {unique_answers} unique answers')
 
-    shared_answers = count_shared_answers(group_answers)
     print('Part 2')
     print(shared_answers)
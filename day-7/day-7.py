@@ -1,5 +1,33 @@
+"""
+Implementation notes:
+`count_outer_colors` and `count_inner_bags` walk the rules recursively and
+visit shared bags again for every path that leads to them. `BagGraph` holds
+the rules as arrays instead: every colour is interned to an integer id, and
+the contents and containers of each bag are slices of flat adjacency arrays
+(offsets + targets). Queries walk the graph with explicit stacks, visit each
+bag at most once and never hit the recursion limit. `read_bag_graph` parses
+the whole file with a single regular expression straight into such a graph,
+without building a dict per rule and bag.
+
+`build_color_index` answers both questions for all colours at once, in one
+pass over the topological order in each direction. The index is stored in
+its own file in the answer cache (see `aoc/cache.py`), outside of the size
+limit of the answers, so it is only built again once the rules or the code
+change. `python3 day-7.py --query <colour>...` looks colours up in it.
+"""
+
 import os
 import re
+import sys
+import tempfile
+from array import array
+from collections import namedtuple
+
+# make the shared `aoc` package importable, no matter from where this script is called
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aoc import bench, cache
+from aoc.inputs import iter_lines, read_text
 
 test_str = """
 light red bags contain 1 bright white bag, 2 muted yellow bags.
@@ -15,21 +43,18 @@ dotted black bags contain no other bags.
 
 regex_subcontent = re.compile(r'(\d+) (.+) bags?')
 
+# either the outer colour of a rule (at the start of a line), or one of its contents
+regex_rule_token = re.compile(r'^(.+?) bags contain |(\d+) (.+?) bags?[,.]', re.MULTILINE)
+
 
 def read_rules(fname='input.txt'):
-    # always find file, no matter from where this script is called
-    fname = os.path.join(
-        os.path.dirname(__file__),
-        fname
+    rules_list = (
+        parse_rule(line)
+        for line
+        in iter_lines(fname, __file__)
+        if line
     )
 
-    with open(fname) as fp:
-        rules_list = [
-            parse_rule(line)
-            for line
-            in fp.read().strip().split('\n') 
-        ]
-
     return {k: v for k, v in rules_list}
 
 
@@ -40,7 +65,6 @@ def parse_rule(rule_str):
     items = []
     if 'no other bags' not in content:
         for sub_content in content.split(', '):
-            sub_content.replace('.', '').strip()
             match = regex_subcontent.match(sub_content)
             items.append({
                 'count': int(match.group(1)),
@@ -106,6 +130,266 @@ def count_inner_bags(outer_bag, rules):
     return sum(num_inner_bags)
 
 
+###############################
+# Graph engine
+###############################
+
+# colors: id -> colour, ids: colour -> id
+# the contents of bag `i` are child_ids[child_start[i]:child_start[i + 1]] (with child_counts),
+# the bags that directly contain bag `i` are parent_ids[parent_start[i]:parent_start[i + 1]]
+# order: all ids, every bag before the bags it contains
+BagGraph = namedtuple('BagGraph', [
+    'colors', 'ids',
+    'child_start', 'child_ids', 'child_counts',
+    'parent_start', 'parent_ids',
+    'order',
+])
+
+
+def _adjacency(num_nodes, edges, num_fields):
+    """
+    Sort edges (source, field_1, ..., field_n) by source into flat arrays.
+    Returns the offsets per source and one array per field.
+    """
+    start = array('l', bytes(array('l').itemsize * (num_nodes + 1)))
+    for edge in edges:
+        start[edge[0] + 1] += 1
+    for i in range(num_nodes):
+        start[i + 1] += start[i]
+
+    position = array('l', start[:-1])
+    fields = [array('l', bytes(array('l').itemsize * len(edges))) for _ in range(num_fields)]
+    for edge in edges:
+        source = edge[0]
+        for field, value in zip(fields, edge[1:]):
+            field[position[source]] = value
+        position[source] += 1
+    return (start, *fields)
+
+
+def _topological_order(num_nodes, child_start, child_ids):
+    # Kahn's algorithm: a bag is ready once all bags containing it are done
+    num_parents = array('l', bytes(array('l').itemsize * num_nodes))
+    for child in child_ids:
+        num_parents[child] += 1
+
+    ready = [node for node in range(num_nodes) if not num_parents[node]]
+    order = array('l')
+    while ready:
+        node = ready.pop()
+        order.append(node)
+        for child in child_ids[child_start[node]:child_start[node + 1]]:
+            num_parents[child] -= 1
+            if not num_parents[child]:
+                ready.append(child)
+
+    if len(order) < num_nodes:
+        raise ValueError('bag rules contain a cycle')
+    return order
+
+
+def _bag_graph(colors, ids, child_start, child_ids, child_counts):
+    """
+    Complete a `BagGraph` from interned colours and the adjacency arrays of the contents.
+    """
+    parent_edges = [
+        (child_ids[i], parent)
+        for parent in range(len(colors))
+        for i in range(child_start[parent], child_start[parent + 1])
+    ]
+    parent_start, parent_ids = _adjacency(len(colors), parent_edges, 1)
+    order = _topological_order(len(colors), child_start, child_ids)
+
+    return BagGraph(colors, ids, child_start, child_ids, child_counts, parent_start, parent_ids, order)
+
+
+def build_bag_graph(rules):
+    """
+    Build a `BagGraph` from rules as returned by `read_rules`.
+    Raises ValueError if a bag (indirectly) contains itself.
+    """
+    ids = {}
+    for outer_color, items in rules.items():
+        ids.setdefault(outer_color, len(ids))
+        for item in items:
+            ids.setdefault(item['color'], len(ids))
+
+    edges = [
+        (ids[outer_color], ids[item['color']], item['count'])
+        for outer_color, items in rules.items()
+        for item in items
+    ]
+    return _bag_graph(list(ids), ids, *_adjacency(len(ids), edges, 2))
+
+
+def parse_rules_compact(text):
+    """
+    Parse all rules of `text` in a single pass of `regex_rule_token`.
+    Colours are interned to ids in the order they first appear.
+
+    Returns a tuple (colors, ids, contents): the colour per id, the id per
+    colour, and per id the contents as a list of (count, inner id) tuples.
+    """
+    colors, ids, contents = [], {}, []
+
+    def intern(color):
+        color_id = ids.get(color)
+        if color_id is None:
+            color_id = ids[color] = len(colors)
+            colors.append(color)
+            contents.append([])
+        return color_id
+
+    items = None
+    for outer_color, count, inner_color in regex_rule_token.findall(text):
+        if outer_color:
+            items = contents[intern(outer_color)]
+        else:
+            items.append((int(count), intern(inner_color)))
+
+    return colors, ids, contents
+
+
+def read_bag_graph(fname='input.txt'):
+    """
+    Read the rules from text file straight into a `BagGraph`.
+    """
+    colors, ids, contents = parse_rules_compact(read_text(fname, __file__))
+
+    # the contents are grouped by outer bag already, so they can be flattened as they are
+    child_start = array('l', [0])
+    child_ids, child_counts = array('l'), array('l')
+    for items in contents:
+        for count, inner in items:
+            child_counts.append(count)
+            child_ids.append(inner)
+        child_start.append(len(child_ids))
+    return _bag_graph(colors, ids, child_start, child_ids, child_counts)
+
+
+def ancestors(graph, color):
+    """
+    All colours of bags that can (directly or indirectly) contain a bag of colour `color`.
+    """
+    if color not in graph.ids:
+        return set()
+
+    seen = bytearray(len(graph.colors))
+    stack = [graph.ids[color]]
+    found = []
+    while stack:
+        node = stack.pop()
+        for parent in graph.parent_ids[graph.parent_start[node]:graph.parent_start[node + 1]]:
+            if not seen[parent]:
+                seen[parent] = 1
+                found.append(parent)
+                stack.append(parent)
+    return {graph.colors[node] for node in found}
+
+
+def count_contained(graph, color):
+    """
+    Count how many bags a bag of colour `color` contains in total.
+    Each bag below `color` is counted once and its total is reused for all its containers.
+    """
+    child_start, child_ids, child_counts = graph.child_start, graph.child_ids, graph.child_counts
+    totals = {}
+    stack = [graph.ids[color]]
+    while stack:
+        node = stack[-1]
+        if node in totals:
+            stack.pop()
+            continue
+        children = range(child_start[node], child_start[node + 1])
+        pending = [child_ids[i] for i in children if child_ids[i] not in totals]
+        if pending:
+            # count the contents first, then come back to this bag
+            stack.extend(pending)
+            continue
+        totals[node] = sum(child_counts[i] * (1 + totals[child_ids[i]]) for i in children)
+        stack.pop()
+    return totals[graph.ids[color]]
+
+
+def build_color_index(graph):
+    """
+    For every colour, count how many colours can contain it and how many bags it contains.
+    Returns a dict colour -> [number of outer colours, number of inner bags].
+    """
+    child_start, child_ids, child_counts = graph.child_start, graph.child_ids, graph.child_counts
+    parent_start, parent_ids = graph.parent_start, graph.parent_ids
+    num_nodes = len(graph.colors)
+
+    # contents before containers: the total of a bag is known once its contents are done
+    totals = [0] * num_nodes
+    for node in reversed(graph.order):
+        totals[node] = sum(
+            child_counts[i] * (1 + totals[child_ids[i]])
+            for i in range(child_start[node], child_start[node + 1])
+        )
+
+    # containers before contents: the ancestors of a bag are its parents and their ancestors,
+    # as a bitset with one bit per colour. Bits are numbered by position in the topological
+    # order, so the ancestors of a bag only use the bits below its own position.
+    position = [0] * num_nodes
+    for i, node in enumerate(graph.order):
+        position[node] = i
+    bitsets = [0] * num_nodes
+    num_outer = [0] * num_nodes
+    # a bitset is dropped once all bags it was needed for are done
+    children_left = [child_start[node + 1] - child_start[node] for node in range(num_nodes)]
+    for node in graph.order:
+        bitset = 0
+        for parent in parent_ids[parent_start[node]:parent_start[node + 1]]:
+            bitset |= bitsets[parent] | (1 << position[parent])
+            children_left[parent] -= 1
+            if not children_left[parent]:
+                bitsets[parent] = 0
+        num_outer[node] = bin(bitset).count('1')
+        if children_left[node]:
+            bitsets[node] = bitset
+
+    return {color: [num_outer[node], totals[node]] for node, color in enumerate(graph.colors)}
+
+
+def load_color_index(fname='input.txt', cache_dir=cache.CACHE_DIR):
+    """
+    Load the `build_color_index` of the rules in file `fname` from the cache, or build and cache it.
+    """
+    key = cache.cache_key(7, 'index', fname)
+    index = cache.get_artifact(7, 'index', key, cache_dir)
+    if index is cache.MISSING:
+        index = build_color_index(read_bag_graph(fname))
+        cache.put_artifact(7, 'index', key, index, cache_dir)
+    return index
+
+
+def query_colors(colors, fname='input.txt', cache_dir=cache.CACHE_DIR):
+    """
+    Print the number of outer colours and of contained bags for each of `colors`, from the cached index.
+    """
+    index = load_color_index(fname, cache_dir)
+    for color in colors:
+        if color not in index:
+            print(f'{color}: unknown colour')
+            continue
+        num_outer, total = index[color]
+        print(f'{color}: can be inside {num_outer} colours, contains {total} bags')
+
+
+# Benchmarks (run with `python3 -m aoc.bench 7` from the repository root)
+@bench.register(day=7, part=1)
+def bench_part_1(fname='input.txt'):
+    graph = read_bag_graph(fname)
+    return lambda: len(ancestors(graph, 'shiny gold'))
+
+
+@bench.register(day=7, part=2)
+def bench_part_2(fname='input.txt'):
+    graph = read_bag_graph(fname)
+    return lambda: count_contained(graph, 'shiny gold')
+
+
 def test_all():
 
     rules = [
@@ -124,16 +408,90 @@ def test_all():
     assert num_inner_bags == 32
 
 
+def test_bag_graph():
+    rules = dict(parse_rule(line) for line in test_str.strip().split('\n'))
+    graph = build_bag_graph(rules)
+    inverse_rules = build_inverse_rules(rules)
+    index = build_color_index(graph)
+    for color in graph.colors:
+        assert ancestors(graph, color) == (count_outer_colors(color, inverse_rules) if color in inverse_rules else set())
+        assert count_contained(graph, color) == count_inner_bags(color, rules)
+        assert index[color] == [len(ancestors(graph, color)), count_contained(graph, color)]
+
+    colors, ids, contents = parse_rules_compact(test_str)
+    assert colors[:3] == ['light red', 'bright white', 'muted yellow']
+    assert contents[ids['muted yellow']] == [(2, ids['shiny gold']), (9, ids['faded blue'])]
+    assert contents[ids['faded blue']] == []
+    assert {
+        colors[outer]: [{'count': count, 'color': colors[inner]} for count, inner in items]
+        for outer, items in enumerate(contents)
+    } == rules
+
+    # every bag comes before its contents
+    position = {node: i for i, node in enumerate(graph.order)}
+    assert all(position[outer] < position[inner] for outer in position for inner in graph.child_ids[graph.child_start[outer]:graph.child_start[outer + 1]])
+    assert ancestors(graph, 'unknown color') == set()
+
+    # a chain far deeper than the recursion limit
+    depth = 2 * sys.getrecursionlimit()
+    chain = {f'bag {i}': [{'count': 2, 'color': f'bag {i + 1}'}] for i in range(depth)}
+    chain[f'bag {depth}'] = []
+    graph = build_bag_graph(chain)
+    assert len(ancestors(graph, f'bag {depth}')) == depth
+    assert count_contained(graph, 'bag 0') == 2 ** (depth + 1) - 2
+
+    assert count_contained(build_bag_graph({'a': []}), 'a') == 0
+    assert build_color_index(graph)['bag 0'] == [0, 2 ** (depth + 1) - 2]
+
+    try:
+        build_bag_graph({'a': [{'count': 1, 'color': 'b'}], 'b': [{'count': 1, 'color': 'a'}]})
+        assert False
+    except ValueError:
+        pass
+
+
+def test_color_index():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fname = os.path.join(tmp_dir, 'rules.txt')
+        with open(fname, 'w') as fp:
+            fp.write(test_str)
+        cache_dir = os.path.join(tmp_dir, 'cache')
+
+        index = load_color_index(fname, cache_dir)
+        assert index == build_color_index(read_bag_graph(fname))
+        assert index['shiny gold'] == [4, 32]
+        assert len(os.listdir(cache_dir)) == 1
+
+        # the second call reads the stored index instead of building it
+        key = cache.cache_key(7, 'index', fname)
+        assert cache.get_artifact(7, 'index', key, cache_dir) == index
+        cache.put_artifact(7, 'index', key, {'shiny gold': [0, 0]}, cache_dir)
+        assert load_color_index(fname, cache_dir) == {'shiny gold': [0, 0]}
+
+        # other rules get a new index, which replaces the old one
+        with open(fname, 'a') as fp:
+            fp.write('plain black bags contain 1 shiny gold bag.\n')
+        assert load_color_index(fname, cache_dir)['shiny gold'] == [5, 32]
+        assert len(os.listdir(cache_dir)) == 1
+        assert cache.get_artifact(7, 'index', key, cache_dir) is cache.MISSING
+
+
 if __name__ == "__main__":
     test_all()
+    test_bag_graph()
+    test_color_index()
 
-    rules = read_rules()    
-    inverse_rules = build_inverse_rules(rules)
+    # python3 day-7.py --query <colour>...: look colours up in the cached index
+    if sys.argv[1:2] == ['--query']:
+        query_colors(sys.argv[2:] or ['shiny gold'])
+        sys.exit()
+
+    graph = read_bag_graph()
 
     print('Part 1')
-    result_1 = count_outer_colors('shiny gold', inverse_rules)
+    result_1 = ancestors(graph, 'shiny gold')
     print(len(result_1))
 
     print('Part 2')
-    result_2 = count_inner_bags('shiny gold', rules)
+    result_2 = count_contained(graph, 'shiny gold')
     print(result_2)
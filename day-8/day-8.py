@@ -1,13 +1,38 @@
+"""
+Implementation notes:
+Part 2 doesn't try every flip of jmp/nop. Every instruction has exactly one
+successor, so one pass backwards from the end of the program finds all
+instructions that lead to the end (`terminating_instructions`). The repair
+is then the flip on the original (looping) path whose new successor is one
+of those instructions. Both steps take O(n).
+
+For running large programs, `compile_program` turns the instructions into
+two flat arrays (opcodes and arguments), which `run_bytecode` runs about
+twice as fast as `run`. Part 1 runs the program once, so that's what it uses.
+`make_runner` goes further: it merges straight runs of instructions into
+blocks and returns a block-table interpreter, which only jumps from block to
+block. Building the blocks takes longer than running the program once, so it
+only pays off for a program that runs many times.
+
+`trace_bytecode` is a separate, instrumented copy of the interpreter, for
+profiling: the other runners don't check for tracing at all, so they don't
+get slower because of it.
+"""
+
 import os
+import sys
+from array import array
+from collections import deque, namedtuple
+
+# make the shared `aoc` package importable, no matter from where this script is called
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aoc import bench
+from aoc.inputs import read_text
 
 
 def read_file(fname='input.txt'):
-    fname = os.path.join(
-        os.path.dirname(__file__),
-        fname
-    )
-    with open(fname, 'r') as fp:
-        return fp.read().strip()
+    return read_text(fname, __file__)
 
 
 def parse(program):
@@ -47,7 +72,7 @@ def run(program):
     return exit_code, accumulator
 
 
-def fix_corruption(program):
+def fix_corruption_by_trial(program):
     """
     Try swapping jmp/nop operation to find a program that terminates correctly
     """
@@ -72,6 +97,257 @@ def fix_corruption(program):
             return accumulator
 
 
+###############################
+# Compiled programs
+###############################
+
+ACC, JMP, NOP = 0, 1, 2
+opcodes = {'acc': ACC, 'jmp': JMP, 'nop': NOP}
+
+# parallel arrays: the opcode and the argument of each instruction
+Bytecode = namedtuple('Bytecode', ['ops', 'args'])
+
+
+def compile_program(program):
+    """
+    Turn a parsed program into `Bytecode`.
+    """
+    return Bytecode(
+        array('b', [opcodes[cmd] for cmd, _ in program]),
+        array('i', [arg for _, arg in program])
+    )
+
+
+def run_bytecode(bytecode):
+    """
+    Like `run`, for a compiled program.
+    """
+    ops, args = bytecode
+    num_instructions = len(ops)
+    visited = bytearray(num_instructions)
+    idx = accumulator = 0
+    while 0 <= idx < num_instructions and not visited[idx]:
+        visited[idx] = 1
+        op = ops[idx]
+        if op == JMP:
+            idx += args[idx]
+            continue
+        if op == ACC:
+            accumulator += args[idx]
+        idx += 1
+    exit_code = 0 if idx == num_instructions else 1
+    return exit_code, accumulator
+
+
+###############################
+# Tracing
+###############################
+
+# exit_code/accumulator: as returned by `run` (exit code 2: stopped after `max_steps`)
+# hits: how often each instruction was executed
+# recent: the last executed instructions, as tuples (step, index, accumulator before the instruction)
+# loop_entry: the first instruction that was executed twice, loop_length: the number of steps between both times
+Trace = namedtuple('Trace', ['exit_code', 'accumulator', 'steps', 'hits', 'recent', 'loop_entry', 'loop_length'])
+
+op_names = {op: name for name, op in opcodes.items()}
+
+
+def trace_bytecode(bytecode, trace_size=32, stop_on_loop=True, max_steps=None):
+    """
+    Run a compiled program like `run_bytecode`, but record a `Trace`.
+
+    With `stop_on_loop=False`, the program keeps running after the first
+    instruction repeats (until it ends or `max_steps` instructions ran), so
+    the hit counts show where a looping program spends its time.
+    """
+    ops, args = bytecode
+    num_instructions = len(ops)
+    hits = array('L', bytes(array('L').itemsize * num_instructions))
+    first_step = {}
+    recent = deque(maxlen=trace_size)
+    loop_entry = loop_length = None
+
+    idx = accumulator = step = 0
+    while 0 <= idx < num_instructions:
+        if hits[idx]:
+            if loop_entry is None:
+                loop_entry, loop_length = idx, step - first_step[idx]
+            if stop_on_loop:
+                break
+        else:
+            first_step[idx] = step
+        if max_steps is not None and step >= max_steps:
+            return Trace(2, accumulator, step, hits, recent, loop_entry, loop_length)
+
+        hits[idx] += 1
+        recent.append((step, idx, accumulator))
+        step += 1
+        op = ops[idx]
+        if op == JMP:
+            idx += args[idx]
+            continue
+        if op == ACC:
+            accumulator += args[idx]
+        idx += 1
+
+    exit_code = 0 if idx == num_instructions else 1
+    return Trace(exit_code, accumulator, step, hits, recent, loop_entry, loop_length)
+
+
+def hot_report(bytecode, trace, top=10):
+    """
+    Format the `top` most executed instructions of a trace as a table.
+    """
+    ops, args = bytecode
+    hottest = sorted(range(len(trace.hits)), key=lambda idx: (-trace.hits[idx], idx))[:top]
+    lines = [f'{"line":>8} {"instruction":<12} {"hits":>10} {"share":>7}']
+    for idx in hottest:
+        if not trace.hits[idx]:
+            break
+        share = trace.hits[idx] / trace.steps
+        lines.append(f'{idx:>8} {op_names[ops[idx]]} {args[idx]:<+8} {trace.hits[idx]:>10} {share:>7.1%}')
+    if trace.loop_entry is not None:
+        lines.append(f'Loop entered at line {trace.loop_entry}, {trace.loop_length} instructions long')
+    return '\n'.join(lines)
+
+
+# the successor of the last block: the program ended correctly, or jumped out of the program
+END, OUTSIDE = -1, -2
+
+
+def make_runner(bytecode):
+    """
+    Return a function that runs the program and returns the same as `run`.
+    Building it costs more than one `run_bytecode`, so use it for programs that run many times.
+
+    A block starts at instruction 0, at each jump target and after each jmp,
+    so control only ever enters a block at its start and then runs all of its
+    instructions. A block is then just the sum of its acc arguments and the
+    block that comes next, which the returned interpreter looks up in two
+    tables: one step per block instead of one per instruction.
+    Revisiting an instruction means revisiting its block, so loops are detected
+    exactly where `run` detects them.
+    """
+    ops, args = bytecode
+    num_instructions = len(ops)
+
+    starts = {0, num_instructions}
+    for idx, (op, arg) in enumerate(zip(ops, args)):
+        if op == JMP:
+            starts.add(idx + 1)
+            if 0 <= idx + arg <= num_instructions:
+                starts.add(idx + arg)
+    starts = sorted(starts)
+    block_of = {start: block for block, start in enumerate(starts[:-1])}
+    block_of[num_instructions] = END
+
+    accumulators, successors = [], []
+    for start, end in zip(starts, starts[1:]):
+        accumulators.append(sum(args[idx] for idx in range(start, end) if ops[idx] == ACC))
+        last = end - 1
+        successor = last + args[last] if ops[last] == JMP else end
+        successors.append(block_of.get(successor, OUTSIDE))
+
+    accumulators, successors = tuple(accumulators), tuple(successors)
+    num_blocks, start = len(accumulators), block_of[0]
+
+    def run_program():
+        visited = bytearray(num_blocks)
+        block = start
+        accumulator = 0
+        while block >= 0 and not visited[block]:
+            visited[block] = 1
+            accumulator += accumulators[block]
+            block = successors[block]
+        return (0 if block == END else 1), accumulator
+
+    return run_program
+
+
+def _successor(idx, cmd, arg):
+    return idx + arg if cmd == 'jmp' else idx + 1
+
+
+def terminating_instructions(program):
+    """
+    Find the instructions from which the program runs to its end correctly.
+    Returns a bytearray with a 1 for each of these instructions, plus an entry
+    for the end of the program itself (index `len(program)`).
+    """
+    num_instructions = len(program)
+    predecessors = [[] for _ in range(num_instructions + 1)]
+    for idx, (cmd, arg) in enumerate(program):
+        successor = _successor(idx, cmd, arg)
+        if 0 <= successor <= num_instructions:
+            predecessors[successor].append(idx)
+
+    # walk backwards from the end
+    reaches_end = bytearray(num_instructions + 1)
+    reaches_end[num_instructions] = 1
+    stack = [num_instructions]
+    while stack:
+        for idx in predecessors[stack.pop()]:
+            if not reaches_end[idx]:
+                reaches_end[idx] = 1
+                stack.append(idx)
+    return reaches_end
+
+
+def fix_corruption(program):
+    """
+    Find the jmp/nop instruction which, when swapped, makes the program
+    terminate correctly. If several do, the first one in the program is swapped,
+    like `fix_corruption_by_trial` does. Returns the accumulator of the repaired
+    program, or None if there is no such instruction (or the program
+    terminates already, so there is nothing to repair).
+    """
+    num_instructions = len(program)
+    reaches_end = terminating_instructions(program)
+    if reaches_end[0]:
+        return None
+
+    # follow the original path until it loops (or jumps out of the program)
+    visited = bytearray(num_instructions)
+    idx = accumulator = 0
+    repair = None
+    while 0 <= idx < num_instructions and not visited[idx]:
+        visited[idx] = 1
+        cmd, arg = program[idx]
+        if cmd != 'acc':
+            # swapping jmp and nop: would the new successor lead to the end?
+            swapped = idx + 1 if cmd == 'jmp' else idx + arg
+            if 0 <= swapped <= num_instructions and reaches_end[swapped] and (repair is None or idx < repair[0]):
+                repair = idx, swapped, accumulator
+        else:
+            accumulator += arg
+        idx = _successor(idx, cmd, arg)
+
+    if repair is None:
+        return None
+
+    # the accumulator when reaching the swapped instruction, plus the rest of the way to the end
+    _, idx, accumulator = repair
+    while idx < num_instructions:
+        cmd, arg = program[idx]
+        if cmd == 'acc':
+            accumulator += arg
+        idx = _successor(idx, cmd, arg)
+    return accumulator
+
+
+# Benchmarks (run with `python3 -m aoc.bench 8` from the repository root)
+@bench.register(day=8, part=1)
+def bench_part_1(fname='input.txt'):
+    program = parse(read_file(fname))
+    return lambda: run_bytecode(compile_program(program))[1]
+
+
+@bench.register(day=8, part=2)
+def bench_part_2(fname='input.txt'):
+    program = parse(read_file(fname))
+    return lambda: fix_corruption(program)
+
+
 def test_all():
     test_str = '''nop +0
 acc +1
@@ -89,13 +365,62 @@ acc +6
     assert result == 5
     assert exit_code == 1
 
+    assert fix_corruption(program) == fix_corruption_by_trial(program) == 8
+    assert list(terminating_instructions(program)) == [0, 0, 0, 0, 0, 0, 0, 0, 1, 1]
+    # several possible repairs: the first one in the program wins
+    program = parse('jmp +3\nnop +6\njmp -2\nnop +4\nacc +10\njmp -4\nacc +100\n')
+    assert fix_corruption(program) == fix_corruption_by_trial(program) == 10
+    program = parse('nop +2\njmp +0\nacc +1\n')
+    assert fix_corruption(program) == fix_corruption_by_trial(program) == 1
+    assert fix_corruption(parse('jmp +0\njmp -1\nacc +3\n')) is None
+
+
+def test_compiled():
+    programs = [
+        'nop +0\nacc +1\njmp +4\nacc +3\njmp -3\nacc -99\nacc +1\njmp -4\nacc +6',
+        'nop +0\nacc +1\njmp +4\nacc +3\njmp -3\nacc -99\nacc +1\nnop -4\nacc +6',
+        'acc +1\njmp +5\nacc +2',  # jumps beyond the end
+        'acc +7\nacc -2',
+        'jmp +0',
+    ]
+    for text in programs:
+        program = parse(text)
+        bytecode = compile_program(program)
+        assert run_bytecode(bytecode) == run(program)
+        assert make_runner(bytecode)() == run(program)
+    assert run(parse(read_file())) == make_runner(compile_program(parse(read_file())))()
+
+    empty = Bytecode(array('b'), array('i'))
+    assert run_bytecode(empty) == make_runner(empty)() == (0, 0)
+
+
+def test_trace():
+    bytecode = compile_program(parse('nop +0\nacc +1\njmp +4\nacc +3\njmp -3\nacc -99\nacc +1\njmp -4\nacc +6'))
+    trace = trace_bytecode(bytecode, trace_size=3)
+    assert (trace.exit_code, trace.accumulator) == run_bytecode(bytecode) == (1, 5)
+    assert trace.steps == 7 and list(trace.hits) == [1, 1, 1, 1, 1, 0, 1, 1, 0]
+    assert list(trace.recent) == [(4, 7, 2), (5, 3, 2), (6, 4, 5)]
+    assert (trace.loop_entry, trace.loop_length) == (1, 6)
+
+    # keep running through the loop
+    trace = trace_bytecode(bytecode, stop_on_loop=False, max_steps=100)
+    assert trace.exit_code == 2 and trace.steps == 100
+    assert list(trace.hits) == [1, 17, 17, 16, 16, 0, 17, 16, 0]
+    assert hot_report(bytecode, trace, top=2).split('\n')[1].split()[:4] == ['1', 'acc', '+1', '17']
+
+    bytecode = compile_program(parse('acc +2\nnop -1\nacc +3'))
+    trace = trace_bytecode(bytecode)
+    assert (trace.exit_code, trace.accumulator, trace.loop_entry) == (0, 5, None)
+
 
 if __name__ == '__main__':
     print('Part 1')
     test_all()
+    test_compiled()
+    test_trace()
     program = read_file()
     program = parse(program)
-    _, result = run(program)
+    _, result = run_bytecode(compile_program(program))
     print(result)
 
     print('Part 2')
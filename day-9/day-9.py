@@ -1,12 +1,33 @@
+"""
+Implementation notes:
+Part 2 looks for a contiguous range that sums to a target, in O(n):
+  - for non-negative numbers, `find_range_two_pointers` slides a window: it
+    grows at the end, and shrinks from the start while its sum is too large
+  - for any integers, `find_range_prefix_sums` looks for two prefix sums
+    that differ by the target (with NumPy for inputs that fit into int64)
+"""
+
 import os
+import sys
+from collections import Counter, deque, namedtuple
+from itertools import islice
+
+# make the shared `aoc` package importable, no matter from where this script is called
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aoc import bench
+from aoc.inputs import read_text
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# the numbers[start:end] sum to the target, low/high are the smallest and largest of them
+ContiguousRange = namedtuple('ContiguousRange', ['start', 'end', 'low', 'high'])
 
 def read_file(fname='input.txt'):
-    fname = os.path.join(
-        os.path.dirname(__file__),
-        fname
-    )
-    with open(fname, 'r') as fp:
-        return fp.read().strip()
+    return read_text(fname, __file__)
 
 
 def parse(contents):
@@ -21,11 +42,24 @@ def find_pair(numbers, target_sum):
     for num in numbers:
         partner_num = target_sum - num
         if partner_num in numbers:
-            return num * partner_num
+            return num, partner_num
     return None
 
 
-def find_invalid_number(numbers, n=25):
+def has_pair(counts, target_sum):
+    """
+    Check if two of the numbers sum to `target_sum`, where `counts` maps
+    each number to how often it occurs (a number can only pair with itself
+    if it occurs twice).
+    """
+    for num in counts:
+        partner_num = target_sum - num
+        if partner_num in counts and (partner_num != num or counts[num] > 1):
+            return True
+    return False
+
+
+def iter_invalid_numbers(numbers, n=25):
     """
     Check all numbers for being "valid". 
     A "valid" number is a number that can be represented
@@ -33,13 +67,106 @@ def find_invalid_number(numbers, n=25):
     Vice versa, an invalid number is a number that does not
     fulfil this criterion.
 
+    `numbers` can be any iterable. The preceding numbers are kept as a
+    window of counts, which is updated (not rebuilt) for each new number.
+    Yields the invalid numbers as they are found.
+    """
+    numbers = iter(numbers)
+    window = deque(islice(numbers, n))
+    counts = Counter(window)
+    for num in numbers:
+        if not has_pair(counts, target_sum=num):
+            yield num
+
+        # slide the window by one number
+        oldest = window.popleft()
+        counts[oldest] -= 1
+        if not counts[oldest]:
+            del counts[oldest]
+        window.append(num)
+        counts[num] += 1
+
+
+def find_invalid_number(numbers, n=25):
+    """
     Returns the first invalid number that's found in the list
     or None if no invalid number is found.
     """
-    for i, num in enumerate(numbers[n:]):
-        prev = set(numbers[i:n+i])
-        if not find_pair(prev, target_sum=num):
-            return num
+    return next(iter_invalid_numbers(numbers, n), None)
+
+
+def find_range_two_pointers(numbers, target_sum, min_len=2):
+    """
+    Find a range of at least `min_len` contiguous numbers that sums to
+    `target_sum`, for non-negative numbers (raises ValueError otherwise).
+
+    `numbers` can be any iterable, only the current window is kept in memory.
+    Returns the `ContiguousRange` that ends first, or None if there is none.
+    """
+    window = deque()
+    start = total = 0
+    for end, num in enumerate(numbers, 1):
+        if num < 0:
+            raise ValueError(f'negative number {num} at index {end - 1}, use find_range_prefix_sums')
+        window.append(num)
+        total += num
+        while total > target_sum and window:
+            total -= window.popleft()
+            start += 1
+        if total == target_sum and len(window) >= min_len:
+            return ContiguousRange(start, end, min(window), max(window))
+    return None
+
+
+def _find_range_prefix_sums_numpy(numbers, target_sum, min_len, chunk_size=1 << 20):
+    prefix_sums = np.concatenate(([0], np.cumsum(numbers, dtype=np.int64)))
+    # for each prefix sum, the first index where it occurs
+    values, first_index = np.unique(prefix_sums, return_index=True)
+
+    for chunk_start in range(min_len, len(prefix_sums), chunk_size):
+        ends = np.arange(chunk_start, min(chunk_start + chunk_size, len(prefix_sums)))
+        wanted = prefix_sums[ends] - target_sum
+        pos = np.minimum(np.searchsorted(values, wanted), len(values) - 1)
+        starts = first_index[pos]
+        found = np.flatnonzero((values[pos] == wanted) & (starts <= ends - min_len))
+        if len(found):
+            start, end = int(starts[found[0]]), int(ends[found[0]])
+            return ContiguousRange(start, end, int(numbers[start:end].min()), int(numbers[start:end].max()))
+    return None
+
+
+def find_range_prefix_sums(numbers, target_sum, min_len=2):
+    """
+    Find a range of at least `min_len` contiguous numbers that sums to
+    `target_sum`, for any integers.
+
+    numbers[start:end] sums to the target if prefix_sum[end] - prefix_sum[start]
+    equals the target. So while going through the prefix sums, a dict remembers
+    where each one occurred first.
+    Returns the `ContiguousRange` that ends first (and for that end, the longest
+    one), or None if there is none.
+    """
+    if np is not None and len(numbers):
+        # only if no prefix sum can overflow
+        limit = 2 ** 62 // (len(numbers) + 1)
+        if isinstance(numbers, np.ndarray):
+            low, high = int(numbers.min()), int(numbers.max())
+        else:
+            low, high = min(numbers), max(numbers)
+        if high < limit and -low < limit and abs(target_sum) < 2 ** 62:
+            return _find_range_prefix_sums_numpy(np.asarray(numbers, dtype=np.int64), target_sum, min_len)
+
+    first_index = {}
+    prefix_sums = [0]
+    for end, num in enumerate(numbers, 1):
+        prefix_sums.append(prefix_sums[-1] + num)
+        # starts that leave at least `min_len` numbers become available one by one
+        if end >= min_len:
+            first_index.setdefault(prefix_sums[end - min_len], end - min_len)
+            start = first_index.get(prefix_sums[end] - target_sum)
+            if start is not None:
+                seq = numbers[start:end]
+                return ContiguousRange(start, end, min(seq), max(seq))
     return None
 
 
@@ -48,13 +175,30 @@ def find_cont_sequence(numbers, target_sum):
     Find a continuous sequence if numbers in `numbers` that sum to `target_sum`.
     Returns the smallest and largest number of that sequence (as a tuple).
     Returns None if no sequence found.
+
+    If several sequences sum to the target, this is the one that ends first
+    (see `find_range_two_pointers` and `find_range_prefix_sums`), not the
+    shortest one: for [1, 2, 3, 4, 2, 9] and 6 it's 1+2+3, not 4+2.
     """
+    if all(num >= 0 for num in numbers):
+        found = find_range_two_pointers(numbers, target_sum)
+    else:
+        found = find_range_prefix_sums(numbers, target_sum)
+    return (found.low, found.high) if found else None
+
 
-    for seq_len in range(2, len(numbers)):
-        for start in range(len(numbers) - seq_len):
-            seq = numbers[start:start+seq_len]
-            if sum(seq) == target_sum:
-                return min(seq), max(seq)
+# Benchmarks (run with `python3 -m aoc.bench 9` from the repository root)
+@bench.register(day=9, part=1)
+def bench_part_1(fname='input.txt'):
+    numbers = parse(read_file(fname))
+    return lambda: find_invalid_number(numbers)
+
+
+@bench.register(day=9, part=2)
+def bench_part_2(fname='input.txt'):
+    numbers = parse(read_file(fname))
+    invalid_number = find_invalid_number(numbers)
+    return lambda: sum(find_cont_sequence(numbers, target_sum=invalid_number))
 
 
 def test_all():
@@ -87,6 +231,30 @@ def test_all():
     assert (a, b) == (15, 47)
     assert a + b == 62
 
+    assert list(iter_invalid_numbers(iter(numbers), n=5)) == [127]
+
+    # the sequence that ends first wins, even if a later one is shorter
+    assert find_cont_sequence([1, 2, 3, 4, 2, 9], 6) == (1, 3)
+    assert find_cont_sequence([1, 2, 3, 4, 2, -9], 6) == (1, 3)
+    assert find_pair([15, 25, 47], 40) == (15, 25)
+    # zero is a valid summand, and a number pairs with itself if it occurs twice in the window
+    assert list(iter_invalid_numbers([0, 3, 5, 5, 8, 10, 99], n=3)) == [99]
+    assert list(iter_invalid_numbers([5, 1, 2, 10, 12], n=3)) == [10]
+    assert list(iter_invalid_numbers([1, 2], n=3)) == []
+
+    assert find_range_two_pointers(iter(numbers), num) == (2, 6, 15, 47)
+    assert find_range_prefix_sums(numbers, num) == (2, 6, 15, 47)
+    assert find_cont_sequence([3, -1, 7, 2, -8, 5], 1) == (-8, 7)
+    for variant in (find_range_two_pointers, find_range_prefix_sums):
+        assert variant([5, 0, 3], 5) == (0, 2, 0, 5)
+        assert variant([1, 5, 4], 5) is None
+        assert variant([], 5) is None
+    # the prefix sums, with and without NumPy
+    assert find_range_prefix_sums([2, -3, 4, 1, -1, 6], 0) == (3, 5, -1, 1)
+    assert find_range_prefix_sums([2, -3, 4, 1, -1, 6], 0, min_len=5) is None
+    assert find_range_prefix_sums([10 ** 30, -10 ** 30, 7], 7) == (0, 3, -10 ** 30, 10 ** 30)
+    assert find_range_prefix_sums(list(range(100)), 197) == (98, 100, 98, 99)
+
 if __name__ == "__main__":
     test_all()
 